@@ -3,27 +3,158 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, ScriptTimeoutException
+import os
 import time
 import csv
-from PIL import Image
-import pytesseract
-import base64 
-import re
 
-pytesseract.pytesseract.tesseract_cmd = r'C:/Program Files/Tesseract-OCR/tesseract.exe'
-options = webdriver.ChromeOptions()
-options.add_argument('--start-maximized')
-driver = webdriver.Chrome(options=options)
-wait = WebDriverWait(driver, 10)
+from adaptive_wait import AdaptiveWaiter
+from browser_profile import DriverRecycler, block_resources, chrome_options
+from captcha_solver import CAPTCHA_MIN_SCORE, read_captcha
+from checkpoint_store import CheckpointStore, court_key, find_cnr
+from case_fields import DISPOSED_FIELDS, FIELD_MAPS, PENDING_FIELDS, extract_case_fields, extract_case_fields_from_html
+from detail_prefetch import PREFETCH_BATCH_SIZE, prefetch_details
+from modal_watcher import drain_modal_events, install_modal_watcher, is_captcha_error
+from output_sinks import open_sink
+from rate_limiter import backoff_delay, limiter_for, set_limiter
+from search_results import CLEAR_RESULTS_JS, CLICK_VIEW_JS, RESULTS_LOADED_JS, make_row_filter, read_result_rows
+from tracing import tracer
+
+# Nothing is started at import: the browser on first use (get_driver) and
+# the OCR engine on the first captcha (captcha_solver.get_engine)
+driver = None
+wait = None
+waiter = None
+recycler = None
+last_modal_message = None
+# How the driver was started and which search it is on, to rebuild it when recycled
+driver_settings = {}
+session_state = {}
+# Site to scrape; point ECOURTS_SITE_URL at mock_ecourts to run offline
+SITE_URL = os.environ.get("ECOURTS_SITE_URL", "https://services.ecourts.gov.in/")
+# Adaptive limit on the searches and case detail requests in flight to the
+# site, fed by their outcomes and the waits for dropdowns and captchas
+limiter = limiter_for(SITE_URL)
+
+
+class SearchFailed(Exception):
+    """
+    Raised when a search did not bring up a result table that could be read.
+    """
+
+
+def use_limiter(shared):
+    """
+    Gate this process's requests to the site on shared, a
+    rate_limiter.SharedLimiter, instead of a limiter of its own.
+    Call before start_driver.
+    """
+    global limiter
+    limiter = shared
+    set_limiter(SITE_URL, shared)
+    if waiter is not None:
+        waiter.limiter = shared
+
+
+def start_driver(lean=False, recycle_after=None, max_memory_mb=None, debugger_address=None):
+    """
+    Start a Chrome session and bind it to the module-level driver and wait.
+
+    Each process that scrapes calls this once, so every worker of the crawl
+    pool owns its own browser. The "validateError" modal watcher is installed
+    for every page the session loads, see modal_watcher, and the readiness
+    waits of adaptive_wait are bound to it.
+
+    Parameters:
+    lean (bool): Run headless and block images, fonts and stylesheets, see browser_profile
+    recycle_after (int): Replace the browser after this many scraped cases
+    max_memory_mb (float): Replace the browser when it uses more memory (needs psutil)
+    debugger_address (str): "host:port" of a running Chrome to attach to instead of
+    launching one, e.g. from browser_session; CHROME_DEBUGGER_ADDRESS by default
+
+    Returns:
+    selenium.webdriver.Chrome: The Selenium WebDriver instance
+    """
+    global driver, wait, waiter, recycler
+    debugger_address = debugger_address or os.environ.get("CHROME_DEBUGGER_ADDRESS")
+    if debugger_address:
+        # The running browser keeps its own flags; chromedriver leaves it open on quit
+        options = webdriver.ChromeOptions()
+        options.add_experimental_option("debuggerAddress", debugger_address)
+    else:
+        options = chrome_options(lean)
+    driver = webdriver.Chrome(options=options)
+    if lean:
+        block_resources(driver)
+    wait = WebDriverWait(driver, 10)
+    # Latency estimates outlive a recycled browser
+    if waiter is None:
+        waiter = AdaptiveWaiter(driver)
+        waiter.limiter = limiter
+    else:
+        waiter.driver = driver
+    install_modal_watcher(driver)
+    recycler = DriverRecycler(recycle_after, max_memory_mb) if recycle_after or max_memory_mb else None
+    driver_settings.update(lean=lean, recycle_after=recycle_after, max_memory_mb=max_memory_mb,
+                           debugger_address=debugger_address)
+    return driver
+
+
+def get_driver():
+    """
+    Return the current driver, starting one with the last settings on first use.
+    """
+    if driver is None:
+        start_driver(**driver_settings)
+    return driver
+
+
+def quit_driver():
+    """
+    Quit the current browser, if any.
+    """
+    global driver
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception as e:
+            print(f"Error quitting browser: {str(e)}")
+        driver = None
+
+
+@tracer.traced("driver_recycle")
+def recycle_driver():
+    """
+    Replace the browser with a fresh one started the same way, and restore
+    the search it was on so the result table can be read again.
+
+    Returns:
+    selenium.webdriver.Chrome: The new Selenium WebDriver instance
+    """
+    global recycler
+    state = dict(session_state)
+    current = recycler
+    quit_driver()
+    start_driver(**driver_settings)
+    if current is not None:
+        current.reset()
+        recycler = current
+    if state and not access_court_services(**state["search"], case_status=state["case_status"]):
+        raise SearchFailed("Search could not be restored in the new browser")
+    return driver
 
 
+@tracer.traced("captcha")
 def get_captcha_text():
+    """
+    Read the captcha on the page with the OCR ensemble.
+
+    Returns:
+    dict: The best reading, see captcha_solver.read_captcha_bytes, or None on error
+    """
     try:
-        # Find the captcha image element
-        captcha_img = wait.until(
-            EC.presence_of_element_located((By.ID, "captcha_image"))
-        )
+        # Wait for the captcha image element
+        wait.until(EC.presence_of_element_located((By.ID, "captcha_image")))
         
         # Get image using JavaScript
         js_script = """
@@ -50,28 +181,12 @@ def get_captcha_text():
         
         # Execute JavaScript to get base64 image
         img_base64 = driver.execute_script(js_script)
-        
-        # Remove the data URL prefix
-        img_base64 = img_base64.replace('data:image/png;base64,', '')
-        
-        # Decode base64 to bytes
-        img_bytes = base64.b64decode(img_base64)
-        
-        # Save bytes to file
-        with open('captcha.png', 'wb') as f:
-            f.write(img_bytes)
-            
-        # Open and process image
-        image = Image.open('captcha.png')
-        
-        # Enhanced OCR configuration
-        custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
-        captcha_text = pytesseract.image_to_string(image, config=custom_config)
-        
-        # Clean up text
-        captcha_text = captcha_text.strip()
-        print(f"Captcha text: {captcha_text}")
-        return captcha_text
+
+        # Decode and OCR every preprocessing variant in memory, in parallel
+        reading = read_captcha(img_base64)
+
+        print(f"Captcha text: {reading['text']} (score {reading['score']:.0f})")
+        return reading
         
     except Exception as e:
         print(f"Failed to get captcha text: {str(e)}")
@@ -79,92 +194,92 @@ def get_captcha_text():
         import traceback
         traceback.print_exc()
         return None
+
+
 def get_values_from_dropdown(select_from):
     """
-    Get all states and their codes from the dropdown menu.
-    Returns a dictionary mapping state codes to state names.
+    Get all values and their labels from a dropdown menu in one round trip.
+    Returns a dictionary mapping option values to option texts, without the
+    "Select ..." placeholder and empty or zero values.
     """
-    values = {}
     try:
-        
-        # Get all option elements
-        options = select_from.find_elements(By.TAG_NAME, "option")
-        print(options)
-        
-        # Extract state codes and names, skipping the first "Select state" option
-        for option in options[1:]:  # Skip first option
-            value = option.get_attribute("value")
-            text = option.text
-            if value and value != "0":  # Skip empty or zero values
-                values[value] = text
-                print(f"Found state: {text} (Code: {value})")
-    
+        options = driver.execute_script(
+            "return Array.from(arguments[0].options, function (o) { return [o.value, o.text.trim()]; });",
+            select_from,
+        )
     except Exception as e:
-        print(f"Error getting states from dropdown: {str(e)}")
+        print(f"Error getting values from dropdown: {str(e)}")
         return {}
-    
-    print(f"Total states found: {len(states)}")
+
+    values = {value: text for value, text in options if value and value != "0"}
+    print(f"Total values found: {len(values)}")
     return values
 
+
+def take_modal_messages():
+    """
+    Return the messages of the modals the watcher dismissed since the last
+    call, remembering the latest one in last_modal_message.
+    """
+    global last_modal_message
+    messages = [event.get("message", "") for event in drain_modal_events(driver)]
+    if messages:
+        last_modal_message = messages[-1]
+    return messages
+
+
+@tracer.traced("modal_check")
 def check_and_close_modal():
     """
-    Helper function to check for modal and close button.
+    Report the modals dismissed since the last check.
 
-    Parameters:
-    driver (selenium.webdriver.Chrome): The Selenium WebDriver instance used to interact with the web page.
-    wait (selenium.webdriver.support.ui.WebDriverWait): The WebDriverWait instance used to wait for specific conditions.
+    The modal watcher closes "validateError" as soon as it appears, so this
+    never waits; it only reads what the watcher recorded in one round trip.
 
     Returns:
-    bool: True if the modal is closed successfully, False otherwise.
+    bool: True if a modal was closed since the last check, False otherwise.
     """
-    try:
-        # First check if modal exists
-        modal = wait.until(
-            EC.presence_of_element_located((By.ID, "validateError"))
-        )
-
-        if modal.is_displayed():
-            print("Modal detected")
-            # Check for close button
-            try:
-                close_button = wait.until(
-                    EC.presence_of_element_located((By.XPATH, "/html/body/div[9]/div/div/div[1]/button"))
-                )
-                if close_button.is_displayed():
-                    print("Close button found, clicking it")
-                    time.sleep(1)
-                    close_button.click()
-                    time.sleep(1)
-                    return True
-                else:
-                    print("Close button exists but is not displayed")
-                    return False
-            except (TimeoutException, NoSuchElementException):
-                print("No close button found on modal")
-                return False
-    except (TimeoutException, NoSuchElementException):
-        print("No modal detected")
-        return False
+    messages = take_modal_messages()
+    for message in messages:
+        print(f"Modal closed: {message}")
+    return bool(messages)
 
 
-def access_court_services(act_name="Indian Penal Code", section_number="376"):
+def access_court_services(act_name="Indian Penal Code", section_number="376",
+                          state_code="18", dist_code="3",
+                          court_complex_code="1180029@1,2,10,11@Y", est_code="1", case_status="pending"):
     """
     Automates the process of accessing court services and searching for specific acts and sections.
 
     Parameters:
     act_name (str): Name of the act to search for (e.g., "Indian Penal Code")
     section_number (str): Section number to search for (e.g., "376")
+    state_code (str): Value of the state in the "sess_state_code" dropdown
+    dist_code (str): Value of the district in the "sess_dist_code" dropdown
+    court_complex_code (str): Value of the court complex in the "court_complex_code" dropdown
+    est_code (str): Value of the establishment in the "court_est_code" dropdown, "" to skip it
+    case_status (str): "pending" or "disposed", the status searched first
 
     Returns:
-    selenium.webdriver.Chrome: The Selenium WebDriver instance
+    bool: True if search results appeared
     """
 
     
 
+    get_driver()
+    court = court_key(state_code, dist_code, court_complex_code, est_code)
+    tracer.set_labels(court=court)
+    waiter.court = court
+    session_state.update(case_status=case_status, search={
+        "act_name": act_name, "section_number": section_number, "state_code": state_code,
+        "dist_code": dist_code, "court_complex_code": court_complex_code, "est_code": est_code,
+    })
+
     try:
         # Initial page load and menu selection
-        driver.get("https://services.ecourts.gov.in/")
-        left_menu = wait.until(EC.element_to_be_clickable((By.ID, "leftPaneMenuCS")))
+        with tracer.span("page_load"):
+            driver.get(SITE_URL)
+            left_menu = wait.until(EC.element_to_be_clickable((By.ID, "leftPaneMenuCS")))
         left_menu.click()
         check_and_close_modal()
 
@@ -173,33 +288,26 @@ def access_court_services(act_name="Indian Penal Code", section_number="376"):
             # State selection
             select_state = wait.until(EC.presence_of_element_located((By.ID, "sess_state_code")))
             states = get_values_from_dropdown(select_state)
-            print("State selection" + str(states))
-            Select(select_state).select_by_visible_text("18")
-            time.sleep(1)
+            print(f"{len(states)} states available")
+            select_dropdown("sess_state_code", state_code)
             check_and_close_modal()
 
-            # District selection
-            time.sleep(3)
-            select_dist = wait.until(EC.presence_of_element_located((By.ID, "sess_dist_code")))
-            Select(select_dist).select_by_value("3")
-            time.sleep(1)
+            # District selection, waits for the district options to load
+            select_dropdown("sess_dist_code", dist_code)
             check_and_close_modal()
 
             # Court complex selection
-            select_court = wait.until(EC.presence_of_element_located((By.ID, "court_complex_code")))
-            Select(select_court).select_by_value("1180029@1,2,10,11@Y")
-            time.sleep(1)
+            select_dropdown("court_complex_code", court_complex_code)
             check_and_close_modal()
 
-            # Court establishment selection
-            select_court = wait.until(EC.presence_of_element_located((By.ID, "court_est_code")))
-            Select(select_court).select_by_value("1")
-            time.sleep(1)
-            check_and_close_modal()
+            # Court establishment selection, some complexes have none
+            if est_code:
+                select_dropdown("court_est_code", est_code)
+                check_and_close_modal()
 
         except Exception as e:
             print(f"Error during location selection: {str(e)}")
-            return driver
+            return False
 
         # Click Act tab and handle modal
         try:
@@ -208,223 +316,423 @@ def access_court_services(act_name="Indian Penal Code", section_number="376"):
                 act_button.click()
             except ElementClickInterceptedException:
                 driver.execute_script("arguments[0].click();", act_button)
-            time.sleep(3)
+            waiter.ajax_idle()
             check_and_close_modal()
 
         except Exception as e:
             print(f"Error clicking act tab: {str(e)}")
-            return driver
+            return False
 
         # Select Act and Section
         try:
             # Select Act
-            select_act = wait.until(EC.presence_of_element_located((By.ID, "actcode")))
-            Select(select_act).select_by_visible_text(act_name)
-            time.sleep(1)
+            select_dropdown("actcode", act_name, by_text=True)
             check_and_close_modal()
 
             # Enter Section
             entersection = wait.until(EC.presence_of_element_located((By.ID, "under_sec")))
             entersection.clear()
             entersection.send_keys(section_number)
-            time.sleep(1)
             check_and_close_modal()
 
+            # Search the disposed cases straight away instead of pending first
+            if case_status == "disposed":
+                disposed_button = wait.until(EC.presence_of_element_located((By.ID, "radDact")))
+                if not disposed_button.is_selected():
+                    driver.execute_script("arguments[0].click();", disposed_button)
+
         except Exception as e:
             print(f"Error selecting act or section: {str(e)}")
-            return driver
+            return False
+
+        # Wait for the previous actions to complete
+        waiter.ajax_idle()
+        return submit_search()
+
+    except Exception as e:
+        print(f"An error occurred: {str(e)}")
+
+    return False
+
+
+@tracer.traced("dropdown_select")
+def select_dropdown(select_id, value, by_text=False):
+    """
+    Select an option of a dropdown by value, or by visible text.
+
+    Waits until the option has been loaded into the dropdown, and after
+    selecting until the AJAX request it triggers has finished.
+    """
+    waiter.option_present(select_id, value, by_text)
+    select_element = driver.find_element(By.ID, select_id)
+    if by_text:
+        Select(select_element).select_by_visible_text(value)
+    else:
+        Select(select_element).select_by_value(value)
+    waiter.ajax_idle()
+    return select_element
+
+
+# Loads a new captcha image the way the page's refresh link does
+REFRESH_CAPTCHA_JS = """
+if (typeof window.refreshCaptcha === 'function') { window.refreshCaptcha(); return; }
+var img = document.getElementById('captcha_image');
+img.src = img.src.split('?')[0] + '?' + Math.random();
+"""
+
+
+def refresh_captcha():
+    """
+    Load a new captcha image and wait until it has arrived.
+    """
+    previous_src = driver.execute_script("return document.getElementById('captcha_image').src;")
+    driver.execute_script(REFRESH_CAPTCHA_JS)
+    waiter.captcha_loaded(previous_src)
+
+
+def fill_captcha(max_attempts=3):
+    """
+    Read the captcha and type it into the search form. A reading scoring
+    below CAPTCHA_MIN_SCORE is not submitted: the captcha is refreshed and
+    read again, and only on the last attempt is the best guess entered anyway.
+
+    Returns:
+    bool: True if a captcha text was entered
+    """
+    try:
+        for attempt in range(max_attempts):
+            print(f"Attempt {attempt + 1} to read captcha")
+            waiter.captcha_loaded()
+            reading = get_captcha_text()
+            captcha_text = reading["text"] if reading else ""
+            if captcha_text and reading["score"] < CAPTCHA_MIN_SCORE and attempt < max_attempts - 1:
+                print(f"Low confidence in {captcha_text} (score {reading['score']:.0f}), refreshing captcha")
+                refresh_captcha()
+                continue
+            if captcha_text:
+                print(f"Successfully extracted text: {captcha_text}")
+                # Try to find and fill captcha input
+                try:
+                    captcha_input = wait.until(
+                        EC.presence_of_element_located((By.ID, "act_captcha_code"))
+                    )
+                    captcha_input.clear()
+                    captcha_input.send_keys(captcha_text)
+                    return True
+                except Exception as e:
+                    print(f"Error inputting captcha: {str(e)}")
+            else:
+                print(f"Failed attempt {attempt + 1}")
+                refresh_captcha()
+
+    except Exception as e:
+        print(f"Error in captcha handling: {str(e)}")
+    return False
+
+
+@tracer.traced("search")
+def click_search():
+    """
+    Click the Search button and wait for the results or an error modal.
+
+    Returns:
+    bool: True if search results appeared
+    """
+    try:
+        # Click Search button
+        wait.until(EC.presence_of_element_located((By.XPATH,'/html/body/div[1]/div/main/div[2]/div/div/div[6]/div[1]/form/div[3]/div[2]/button')))
+        search_button = wait.until(EC.element_to_be_clickable((By.XPATH,'/html/body/div[1]/div/main/div[2]/div/div/div[6]/div[1]/form/div[3]/div[2]/button')))
+        print("Search button located.")
+        check_and_close_modal()
+        # Clear the previous results so the waits below only see the new ones
+        driver.execute_script(CLEAR_RESULTS_JS)
+        driver.execute_script("arguments[0].click();", search_button)
+        print("Search Button Clicked.")
+
+        def results_or_modal(d):
+            if d.execute_script(RESULTS_LOADED_JS):
+                return "results"
+            messages = take_modal_messages()
+            return messages[-1] if messages else False
 
-        # Handle Captcha
-        try:
-            # Wait for the previous actions to complete
-            time.sleep(2)
-            
-            # Try to get captcha multiple times if needed
-            max_attempts = 3
-            for attempt in range(max_attempts):
-                print(f"Attempt {attempt + 1} to read captcha")
-                captcha_text = get_captcha_text()
-                if captcha_text:
-                    print(f"Successfully extracted text: {captcha_text}")
-                    # Try to find and fill captcha input
-                    try:
-                        captcha_input = wait.until(
-                            EC.presence_of_element_located((By.ID, "act_captcha_code"))
-                        )
-                        captcha_input.clear()
-                        captcha_input.send_keys(captcha_text)
-                        break
-                    except Exception as e:
-                        print(f"Error inputting captcha: {str(e)}")
-                else:
-                    print(f"Failed attempt {attempt + 1}")
-                    time.sleep(2)  # Wait before next attempt
-            
-        except Exception as e:
-            print(f"Error in captcha handling: {str(e)}")
         try:
-            # Click Search button
-            wait.until(EC.presence_of_element_located((By.XPATH,'/html/body/div[1]/div/main/div[2]/div/div/div[6]/div[1]/form/div[3]/div[2]/button')))
-            search_button = wait.until(EC.element_to_be_clickable((By.XPATH,'/html/body/div[1]/div/main/div[2]/div/div/div[6]/div[1]/form/div[3]/div[2]/button')))
-            print("Search button located.")
-            driver.execute_script("arguments[0].click();", search_button)
-            print("Search Button Clicked.")
-            check_and_close_modal()
-            try:
-                wait.until(EC.presence_of_element_located((By.ID, "res_act")))
+            # The slowest step of a court, so it gets that court's own adaptive timeout
+            outcome = waiter.until("search_results", results_or_modal)
+            if outcome == "results":
                 print("Search results found")
-            
-            except TimeoutException:
-                print("No search results found")
-        except:
-            print("Error clicking search button")
-            
-        # Wait for search results
+                return True
+            print(f"Search rejected: {outcome}")
 
+        except TimeoutException:
+            print("No search results found")
+    except:
+        print("Error clicking search button")
+    return False
 
-    except Exception as e:
-        print(f"An error occurred: {str(e)}")
 
-    return driver
+def submit_search(max_attempts=3):
+    """
+    Fill the captcha and search, solving a new captcha straight away when the
+    site's modal reports the previous one was wrong. The new captcha is
+    loaded explicitly, so the rejected image is never read again.
+
+    Returns:
+    bool: True if search results appeared
+    """
+    global last_modal_message
+    for attempt in range(max_attempts):
+        last_modal_message = None
+        if fill_captcha():
+            with limiter.slot() as slot:
+                if click_search():
+                    return True
+                if last_modal_message:
+                    slot.outcome = "captcha" if is_captcha_error(last_modal_message) else "modal"
+                else:
+                    slot.outcome = "timeout"
+        if not is_captcha_error(last_modal_message):
+            return False
+        if attempt + 1 == max_attempts:
+            break
+        print(f"Wrong captcha, retrying ({attempt + 1}/{max_attempts})")
+        try:
+            refresh_captcha()
+        except Exception as e:
+            print(f"Error refreshing captcha: {str(e)}")
+            return False
+    return False
 
 
-def process_search_results(case_status):
+def process_search_results(case_status, sink=None, store=None, court="", row_filter=None, archive=None,
+                           prefetch=0, act_name=None, section_number=None):
     """
     Process all search results, navigate to each "View" page, and scrape data.
-    Only processes rows where the case year is 2024.
+    Only processes rows accepted by row_filter, by default rows where the
+    case year is 2024 (see search_results.make_row_filter).
+
+    The whole result table is read in one call and filtered before any
+    "View" is clicked. Each row is then found again by its onclick in the
+    current table, so the table may re-render after going back.
+
+    If a sink from output_sinks is given, each case is written to it as soon
+    as it is scraped and not kept in the returned list.
+
+    If a CheckpointStore is given, rows whose CNR Number is already stored
+    are skipped before clicking "View", and every scraped case is recorded
+    under the court key once it has been written to the sink (or added to
+    the returned list), so an interrupted run never stores a case its
+    output is missing. act_name and section_number name the search the
+    store counts the cases for.
+
+    If a PageArchive is given, the raw detail page of every case is saved.
+
+    When the driver was started with a recycle limit, the browser is replaced
+    once it is reached and the search is restored before the next row.
+
+    With prefetch > 0, no "View" is clicked: the detail fragments of the
+    matching rows are fetched by the page that many at a time, see
+    detail_prefetch, and rows whose fetch fails fall back to clicking "View".
+
+    Raises:
+    SearchFailed: If the result table did not load, or the search could not
+    be restored after recycling the browser. Errors of single rows are
+    reported and skipped; any other error is raised as well, so callers only
+    mark a search done when all of it was read.
     """
     
     all_case_data = []
+    row_filter = row_filter or make_row_filter()
 
+    # Read all rows in the search results as plain data
+    print("Waiting for rows to load...")
     try:
-        # Locate all rows in the search results starting from the second row
+        waiter.result_rows()
+    except TimeoutException as e:
+        raise SearchFailed(f"Search results did not load: {e.msg}")
+    rows = read_result_rows(driver)
+    print(f"{len(rows)} rows found")
+
+    if prefetch:
+        scraped = iter_prefetched_cases(rows, row_filter, case_status, store, court, archive, prefetch)
+    else:
+        scraped = iter_clicked_cases(rows, row_filter, case_status, store, court, archive)
+
+    for row, case_details in scraped:
+        if case_details and sink is not None:
+            sink.write(case_details)
+        elif case_details:
+            all_case_data.append(case_details)
+        cnr = find_cnr((case_details or {}).get("CNR Number")) or find_cnr(row["onclick"])
+        if case_details and store is not None and cnr:
+            store.save_case(cnr, case_details, case_status, court, row["case_number"], row["onclick"],
+                            act_name, section_number)
+        if case_details and recycler is not None:
+            recycler.case_done()
+            if recycler.due(driver):
+                recycle_driver()
+
+    return all_case_data
+
+
+def iter_clicked_cases(rows, row_filter, case_status, store=None, court="", archive=None):
+    """
+    Yield (row, case details) for each matching row not in the store yet,
+    by clicking its "View" link.
+    """
+    for row in iter_matching_rows(rows, row_filter, store):
+        with tracer.context(case=row["case_number"]), tracer.span("row"):
+            case_details = process_row(row, case_status, court, archive)
+        yield row, case_details
+
+
+def iter_prefetched_cases(rows, row_filter, case_status, store=None, court="", archive=None, concurrency=4):
+    """
+    Yield (row, case details) for each matching row not in the store yet,
+    fetched concurrently by the page in batches of PREFETCH_BATCH_SIZE, at
+    most concurrency at once and no more than the site's adaptive limit allows.
+    A row whose fetch failed, or whose fragment shows another case, is
+    opened with "View" instead.
+    """
+    todo = list(iter_matching_rows(rows, row_filter, store))
+
+    for start in range(0, len(todo), PREFETCH_BATCH_SIZE):
+        batch = todo[start:start + PREFETCH_BATCH_SIZE]
+        in_flight = min(concurrency, limiter.limit())
+        limiter.acquire(in_flight)
+        started = time.perf_counter()
         try:
-            print("Waiting for rows to load...")
-            rows=[]
-            wait.until(EC.visibility_of_all_elements_located((By.XPATH, "//*[@id='dispTable']/tbody/tr[position() > 1]")))
-            rows=driver.find_elements(By.XPATH, "//*[@id='dispTable']/tbody/tr[position() > 1]")
-            print(rows)
-        except Exception as e:
-            print(f"Error finding rows: {str(e)}")
+            with tracer.span("prefetch"):
+                fetched = prefetch_details(driver, batch, in_flight)
+        except ScriptTimeoutException:
+            fetched = [(row, None, "timed out") for row in batch]
+        finally:
+            limiter.release(in_flight)
+        # Rough per-request latency: the batch ran in ceil(len / in_flight) rounds
+        latency = (time.perf_counter() - started) / -(-len(batch) // in_flight)
+        for _, _, error in fetched:
+            if error:
+                limiter.record("timeout" if error.startswith("timed out") else "error")
+            else:
+                limiter.record("ok", latency)
+        for row, page_html, error in fetched:
+            # The fetch is in the batch's "prefetch" span; a row span only
+            # covers extraction, or the click fallback of a failed fetch
+            with tracer.context(case=row["case_number"]), tracer.span("row"):
+                if not error:
+                    with tracer.span("detail_extract"):
+                        case_details = extract_case_fields_from_html(page_html, case_status)
+                    row_cnr = find_cnr(row["onclick"])
+                    cnr = find_cnr(case_details.get("CNR Number")) or row_cnr
+                    if row_cnr and cnr != row_cnr:
+                        error = f"fragment shows case {cnr}, expected {row_cnr}"
+                    elif archive is not None:
+                        archive.save(page_html, cnr, case_status, court)
+                if error:
+                    print(f"Prefetch of row {row['index'] + 1} failed ({error}), opening it instead")
+                    case_details = process_row(row, case_status, court, archive)
+            print(f"Scraped row {row['index'] + 1}, Case Number: {row['case_number']}")
+            yield row, case_details
+
+
+def process_row(row, case_status, court="", archive=None, max_attempts=3):
+    """
+    Open one result row's "View" page, scrape it and go back to the results.
 
-        for index, row in enumerate(rows):
-            try:
-                print(f"Processing row {index + 1}")
+    The click and the scrape take a slot of the site's limiter. A failed
+    attempt goes back to the results and is retried after a jittered
+    backoff, see rate_limiter.
 
-                # Extract the case number from the second <td> (index 1) element
-                case_number_cell = row.find_elements(By.TAG_NAME, "td")[1].text
-                print(f"Case Number: {case_number_cell}")
+    Returns:
+    dict: The case details, or None if the row failed
+    """
+    index = row["index"]
+    print(f"Processing row {index + 1}, Case Number: {row['case_number']}")
 
-                # Check if the year at the end of the case number is 2024
-                match = re.search(r'(\d{4})$', case_number_cell)
-                if match and match.group(1) == "2024":
-                    # If the year is 2024, click the "View" button (last <td> element)
-                    view_button = row.find_elements(By.TAG_NAME, "td")[-1].find_element(By.TAG_NAME, "a")
-                    print(f"Year is 2024, clicking 'View' button.")
-                    driver.execute_script("arguments[0].click();", view_button)
+    row_cnr = find_cnr(row["onclick"])
+
+    for attempt in range(max_attempts):
+        try:
+            with limiter.slot() as slot:
+                try:
+                    # Click the row's "View" link once the table is rendered again
+                    waiter.until("view_link", lambda d: d.execute_script(CLICK_VIEW_JS, row["onclick"]))
+                    print("Clicked 'View' button.")
 
-                    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, "/html/body/div[1]/div/main/div[2]/div/div/div[6]/div[2]")))
                     # Scrape the data
-                    case_details = scrape_case_details(case_status)
+                    case_details = scrape_case_details(case_status, archive, court)
                     print("Scraped a row")
-                    if case_details:
-                        all_case_data.append(case_details)
-
-                    try:
-                        back_button = wait.until(EC.presence_of_element_located((By.XPATH, "/html/body/div[1]/div/main/div[2]/div/div/div[6]/p/button")))
-                        driver.execute_script("arguments[0].click();", back_button)
-                        print("Back button clicked")
-                        
-                    except TimeoutException:
-                        print("Unable to find back button")
+                except TimeoutException:
+                    slot.outcome = "timeout"
+                    raise
+            cnr = find_cnr(case_details.get("CNR Number")) or row_cnr
+            if row_cnr and cnr != row_cnr:
+                raise ValueError(f"Detail page shows case {cnr}, expected {row_cnr}")
 
+            with tracer.span("back_navigation"):
+                try:
+                    back_button = wait.until(EC.presence_of_element_located((By.XPATH, "/html/body/div[1]/div/main/div[2]/div/div/div[6]/p/button")))
+                    driver.execute_script("arguments[0].click();", back_button)
+                    print("Back button clicked")
 
-                else:
-                    print(f"Skipping row {index + 1}, year is not 2024.")
+                except TimeoutException:
+                    print("Unable to find back button")
+            return case_details
 
-            except Exception as e:
-                print(f"Error processing row {index + 1}: {str(e)}")
+        except Exception as e:
+            print(f"Error processing row {index + 1}: {str(e)}")
+            with tracer.span("back_navigation"):
                 try:
-                    time.sleep(3)
+                    waiter.ajax_idle()
                     back_button = wait.until(EC.presence_of_element_located((By.ID, "main_back_act")))
                     back_button.click()
                     print("Back button clicked")
-                    
+
                 except TimeoutException:
                     print("Unable to find back button")
-                wait.until(EC.visibility_of_all_elements_located((By.XPATH, "//button[contains(text(), 'View')]")))
-                
-
-    except Exception as e:
-        print(f"Error processing search results: {str(e)}")
+            if attempt + 1 < max_attempts:
+                delay = backoff_delay(attempt)
+                print(f"Retrying row {index + 1} in {delay:.1f}s")
+                time.sleep(delay)
+    return None
 
-    return all_case_data
 
-def scrape_case_details(case_status):
+def iter_matching_rows(rows, row_filter, store=None):
+    """
+    Yield the rows accepted by row_filter whose case is not in the store,
+    reporting the ones skipped.
+    """
+    for row in rows:
+        row_cnr = find_cnr(row["onclick"])
+        if not row_filter(row):
+            print(f"Skipping row {row['index'] + 1}, {row['case_number']} does not match the filter.")
+        elif store is not None and row_cnr and store.has_case(row_cnr):
+            print(f"Skipping row {row['index'] + 1}, case {row_cnr} already scraped.")
+        else:
+            yield row
+
+
+@tracer.traced("detail_extract")
+def scrape_case_details(case_status, archive=None, court=""):
     """
     Scrape details from the detailed case page.
+
+    All fields are pulled in one execute_script call, see case_fields.
+    If a PageArchive is given, the raw "CSact" HTML is saved to it as well.
     """
     print("Inside scrape_case_detail function")
-    time.sleep(3)
-    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "CSact")))
-    table = driver.find_element(By.XPATH, '//*[@id="CSact"]/table[1]')
+    waiter.case_detail_rendered()
     print("extracting fields.")
-    
-    if case_status=="pending":
-        print("pending cases")
-        fields = {
-        "Case Type": '//*[@id="CSact"]/table[1]/tbody/tr[1]/td[2]',
-        "Filing Number": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[2]',
-        "Filing Date": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[4]',
-        "Registration Number": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[2]/label',
-        "Registration Date": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[4]',
-        "CNR Number": '//*[@id="CSact"]/table[1]/tbody/tr[4]/td[2]/span',
-        "First Hearing Date": '//*[@id="CSact"]/table[2]/tbody/tr[1]/td[2]',
-        "Next Hearing Date": '//*[@id="CSact"]/table[2]/tbody/tr[2]/td[2]/strong',
-        "Case Stage": '//*[@id="CSact"]/table[2]/tbody/tr[3]/td[2]/label/strong',
-        "Court Number and Judge": '//*[@id="CSact"]/table[2]/tbody/tr[4]/td[2]/label/strong',
-        "Petitioner and Advocate": '//*[@id="CSact"]/table[3]/tbody/tr/td',
-        "Respondent and Advocate": '//*[@id="CSact"]/table[4]/tbody/tr/td',
-        "Police Station": '//*[@id="CSact"]/table[7]/tbody/tr[1]/td[2]',
-        "FIR Number": '//*[@id="CSact"]/table[7]/tbody/tr[2]/td[2]',
-        "Year": '//*[@id="CSact"]/table[7]/tbody/tr[3]/td[2]',
-        "Case Transfer Date": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[2]',
-        "From Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[3]',
-        "To Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[4]'
-        }
-    elif case_status=="disposed":
-        print("disposed cases")
-        fields = {
-        "Case Type": '//*[@id="CSact"]/table[1]/tbody/tr[1]/td[2]',
-        "Filing Number": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[2]',
-        "Filing Date": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[4]',
-        "Registration Number": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[2]/label',
-        "Registration Date": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[4]',
-        "CNR Number": '//*[@id="CSact"]/table[1]/tbody/tr[4]/td[2]/span',
-        "First Hearing Date": '//*[@id="CSact"]/table[2]/tbody/tr[1]/td[2]',
-        "Decision Date": '//*[@id="CSact"]/table[2]/tbody/tr[2]/td[2]/strong',
-        "Case Status": '//*[@id="CSact"]/table[2]/tbody/tr[3]/td[2]/strong,',
-        "Nature of Disposal": '//*[@id="CSact"]/table[2]/tbody/tr[4]/td[2]/label/strong',
-        "Court Number and Judge": '//*[@id="CSact"]/table[2]/tbody/tr[5]/td[2]/label/strong',
-        "Petitioner and Advocate": '//*[@id="CSact"]/table[3]/tbody/tr/td',
-        "Respondent and Advocate": '//*[@id="CSact"]/table[4]/tbody/tr/td',
-        "Police Station": '//*[@id="CSact"]/table[7]/tbody/tr[1]/td[2]',
-        "FIR Number": '//*[@id="CSact"]/table[7]/tbody/tr[2]/td[2]',
-        "Year": '//*[@id="CSact"]/table[7]/tbody/tr[3]/td[2]',
-        "Case Transfer Date": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[2]',
-        "From Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[3]',
-        "To Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[4]'}
-    else:
-        "Not valid Case Status"
-    case_details = {}
 
-    for field, xpath in fields.items():
-        try:
-            value = table.find_element(By.XPATH, xpath).text.strip()       
-            case_details[field] = value
-        except:
-            case_details[field] = "N/A"  # Handle missing values
-            
+    if case_status not in FIELD_MAPS:
+        print("Not valid Case Status")
+        return {}
+    print(f"{case_status} cases")
+    case_details = extract_case_fields(driver, case_status)
+
+    if archive is not None:
+        page_html = driver.execute_script("return document.getElementById('CSact').outerHTML;")
+        archive.save(page_html, find_cnr(case_details.get("CNR Number")), case_status, court)
+
     print(f"Scraped details: {case_details}")
     return case_details
 
@@ -437,11 +745,15 @@ def save_to_csv(data, filename="case_details.csv"):
         return 
 
     try:
-        # Extract headers from the case
-        headers = data[0].keys()
+        # Extract headers from all cases, pending and disposed rows differ
+        headers = []
+        for case in data:
+            for key in case:
+                if key not in headers:
+                    headers.append(key)
 
         with open(filename, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=headers)
+            writer = csv.DictWriter(file, fieldnames=headers, restval="N/A")
             writer.writeheader()
             writer.writerows(data)
 
@@ -450,77 +762,99 @@ def save_to_csv(data, filename="case_details.csv"):
         print(f"Error saving to CSV: {str(e)}")
         
 def switch_to_disposed_cases():
+    """
+    Search the disposed cases of the act, section and court already selected.
+
+    Returns:
+    bool: True if search results appeared
+    """
+    session_state["case_status"] = "disposed"
     try:
         disposed_button = wait.until(EC.element_to_be_clickable((By.ID, "radDact")))
         try:
             disposed_button.click()
         except ElementClickInterceptedException:
             driver.execute_script("arguments[0].click();", disposed_button)
-        time.sleep(3)
+        waiter.ajax_idle()
         check_and_close_modal()
 
     except Exception as e:
         print(f"Error clicking disposed tab: {str(e)}")
+        return False
     
     # Handle Captcha
-    try:
+    waiter.ajax_idle()
+    return submit_search()
 
-        time.sleep(2)
 
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            print(f"Attempt {attempt + 1} to read captcha")
-            captcha_text = get_captcha_text()
-            if captcha_text:
-                print(f"Successfully extracted text: {captcha_text}")
-                # Try to find and fill captcha input
-                try:
-                    captcha_input = wait.until(
-                        EC.presence_of_element_located((By.ID, "act_captcha_code"))
-                    )
-                    captcha_input.clear()
-                    captcha_input.send_keys(captcha_text)
-                    break
-                except Exception as e:
-                    print(f"Error inputting captcha: {str(e)}")
-            else:
-                print(f"Failed attempt {attempt + 1}")
-                time.sleep(2)  # Wait before next attempt
-            
-    except Exception as e:
-        print(f"Error in captcha handling: {str(e)}")
-        
+def search_again(act_name, section_number, case_status="pending"):
+    """
+    Search another act and section, or the disposed cases, in the court that
+    is already selected, without reloading the page or the court dropdowns.
+
+    Returns:
+    bool: True if search results appeared
+    """
+    session_state["search"].update(act_name=act_name, section_number=section_number)
+    session_state["case_status"] = case_status
     try:
-        # Click Search button
-        wait.until(EC.presence_of_element_located((By.XPATH,'/html/body/div[1]/div/main/div[2]/div/div/div[6]/div[1]/form/div[3]/div[2]/button')))
-        search_button = wait.until(EC.element_to_be_clickable((By.XPATH,'/html/body/div[1]/div/main/div[2]/div/div/div[6]/div[1]/form/div[3]/div[2]/button')))
-        print("Search button located.")
-        driver.execute_script("arguments[0].click();", search_button)
-        print("Search Button Clicked.")
+        # The search form is hidden behind the results on some pages
+        if not driver.find_element(By.ID, "under_sec").is_displayed():
+            back_buttons = driver.find_elements(By.ID, "main_back_act")
+            if back_buttons:
+                driver.execute_script("arguments[0].click();", back_buttons[0])
+                waiter.ajax_idle()
+
+        select_dropdown("actcode", act_name, by_text=True)
+        entersection = wait.until(EC.presence_of_element_located((By.ID, "under_sec")))
+        entersection.clear()
+        entersection.send_keys(section_number)
+
+        if case_status == "disposed":
+            disposed_button = wait.until(EC.presence_of_element_located((By.ID, "radDact")))
+            if not disposed_button.is_selected():
+                driver.execute_script("arguments[0].click();", disposed_button)
+        waiter.ajax_idle()
         check_and_close_modal()
-        try:
-            wait.until(EC.presence_of_element_located((By.ID, "res_act")))
-            print("Search results found")
-        
-        except TimeoutException:
-            print("No search results found")
-    except:
-        print("Error clicking search button")
-            
-    # Wait for search results
-    return driver
+
+    except Exception as e:
+        print(f"Error preparing search for {act_name} {section_number}: {str(e)}")
+        return False
+
+    return submit_search()
 
 
 if __name__ == "__main__":
     act_name = input("Enter Act name (default: Indian Penal Code): ") or "Indian Penal Code"
     section_number = input("Enter Section number (default: 376): ") or "376"
 
-    driver = access_court_services(act_name, section_number)
-
-    all_case_data = process_search_results("pending")
+    # Reruns skip cases already in the checkpoint and append to the outputs;
+    # a search is only marked done once all of its results were read
+    court = court_key("18", "3", "1180029@1,2,10,11@Y", "1")
+    with CheckpointStore() as store:
+        try:
+            if access_court_services(act_name, section_number):
+                store.start_court(court, act_name, section_number, "pending")
+                with open_sink("case_details.csv", list(PENDING_FIELDS), append=True) as sink:
+                    process_search_results("pending", sink, store, court,
+                                           act_name=act_name, section_number=section_number)
+                store.finish_court(court, act_name, section_number, "pending")
+            else:
+                print("Pending search failed")
+        except Exception as e:
+            print(f"Pending search failed: {str(e)}")
 
-    save_to_csv(all_case_data)
+        try:
+            if switch_to_disposed_cases():
+                store.start_court(court, act_name, section_number, "disposed")
+                with open_sink("disposed_case_details.csv", list(DISPOSED_FIELDS), append=True) as sink:
+                    process_search_results("disposed", sink, store, court,
+                                           act_name=act_name, section_number=section_number)
+                store.finish_court(court, act_name, section_number, "disposed")
+            else:
+                print("Disposed search failed")
+        except Exception as e:
+            print(f"Disposed search failed: {str(e)}")
 
-    switch_to_disposed_cases()
-    all_disposed_case_data = process_search_results("disposed")
-    save_to_csv(all_disposed_case_data, "disposed_case_details.csv")
+    tracer.export_trace("trace.json")
+    tracer.export_metrics("metrics.prom")
@@ -0,0 +1,171 @@
+"""
+Condition-based waits with timeouts adapted to each court's latency.
+
+Instead of sleeping a fixed time after every action, the scraper waits for a
+concrete readiness signal (dropdown options loaded, AJAX idle, "CSact"
+rendered, "dispTable" rows present) polled every 100 ms. How long each
+signal took is tracked per court and signal, and the timeout is derived from
+it the way TCP derives its retransmission timeout: smoothed latency plus four
+times its deviation, doubled after every timeout and clamped to a range.
+Fast courts therefore go at network speed while slow ones get the time they
+need.
+"""
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# True once no jQuery request is in flight and the document has loaded
+AJAX_IDLE_JS = """
+return document.readyState === 'complete' && (!window.jQuery || window.jQuery.active === 0);
+"""
+
+# True once the select has the given option, or any real option when none is given
+OPTION_PRESENT_JS = """
+var select = document.getElementById(arguments[0]), value = arguments[1], byText = arguments[2];
+if (!select) { return false; }
+return Array.from(select.options).some(function (o) {
+    if (!o.value || o.value === '0') { return false; }
+    if (value === null) { return true; }
+    return byText ? o.text.trim() === value : o.value === value;
+});
+"""
+
+# True once the captcha image has loaded, and no longer has the src given
+CAPTCHA_LOADED_JS = """
+var img = document.getElementById('captcha_image');
+return !!img && img.complete && img.naturalWidth > 0 && (!arguments[0] || img.src !== arguments[0]);
+"""
+
+CASE_DETAIL_RENDERED_JS = """
+return !!document.querySelector('#CSact table');
+"""
+
+# True once the result table has rows, or the search loaded results without
+# a table, which is how a search with no cases ends
+RESULT_ROWS_JS = """
+var table = document.getElementById('dispTable');
+if (table) { return table.querySelectorAll('tr').length > 1; }
+var results = document.getElementById('res_act');
+return !!results && results.textContent.trim().length > 0;
+"""
+
+
+class LatencyEstimator:
+    """
+    Smoothed latency and deviation of one signal, and the timeout they give.
+
+    Parameters:
+    initial (float): Timeout before anything was observed
+    minimum (float): Lowest timeout ever used
+    maximum (float): Highest timeout ever used
+    """
+
+    def __init__(self, initial=10, minimum=2, maximum=60):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.srtt = None
+        self.rttvar = None
+        self.backoff = 1
+
+    def observe(self, seconds):
+        if self.srtt is None:
+            self.srtt, self.rttvar = seconds, seconds / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - seconds)
+            self.srtt = 0.875 * self.srtt + 0.125 * seconds
+        self.backoff = 1
+
+    def timed_out(self):
+        self.backoff = min(self.backoff * 2, 64)
+
+    def timeout(self):
+        base = self.initial if self.srtt is None else self.srtt + 4 * self.rttvar
+        return max(self.minimum, min(self.maximum, base * self.backoff))
+
+
+class AdaptiveWaiter:
+    """
+    Waits on readiness signals of one driver with per-court adaptive timeouts.
+
+    Set court to the current court key; estimates are kept per court and
+    signal, so a worker moving between courts keeps what it learnt of each.
+    If limiter is set to a rate_limiter.AimdLimiter, the waits for a site
+    response made outside a limiter slot (dropdown options, captcha image)
+    are reported to it as a success or a timeout. Client-side waits such as
+    ajax_idle are not, and neither are the waits inside a search or detail
+    slot, whose outcome the slot records.
+    """
+
+    def __init__(self, driver, initial=10, minimum=2, maximum=60, poll_frequency=0.1):
+        self.driver = driver
+        self.court = ""
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.poll_frequency = poll_frequency
+        self.estimators = {}
+        self.limiter = None
+        self._lock = threading.Lock()
+
+    def estimator(self, signal):
+        key = (self.court, signal)
+        with self._lock:
+            if key not in self.estimators:
+                self.estimators[key] = LatencyEstimator(self.initial, self.minimum, self.maximum)
+            return self.estimators[key]
+
+    def until(self, signal, condition, report=False):
+        """
+        Wait until condition(driver) is truthy and return its value.
+        With report set, the wait is also recorded to the limiter.
+
+        Raises:
+        TimeoutException: If the signal did not arrive within the adaptive timeout
+        """
+        estimator = self.estimator(signal)
+        timeout = estimator.timeout()
+        started = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(
+                condition, f"{signal} not ready after {timeout:.1f}s")
+        except TimeoutException:
+            estimator.timed_out()
+            if report and self.limiter is not None:
+                self.limiter.record("timeout")
+            raise
+        elapsed = time.perf_counter() - started
+        estimator.observe(elapsed)
+        if report and self.limiter is not None:
+            self.limiter.record("ok", elapsed)
+        return result
+
+    def script(self, signal, js, *args, report=False):
+        return self.until(signal, lambda d: d.execute_script(js, *args), report)
+
+    def ajax_idle(self):
+        return self.script("ajax_idle", AJAX_IDLE_JS)
+
+    def option_present(self, select_id, value=None, by_text=False):
+        return self.script(f"options:{select_id}", OPTION_PRESENT_JS, select_id, value, by_text, report=True)
+
+    def captcha_loaded(self, previous_src=None):
+        return self.script("captcha_image", CAPTCHA_LOADED_JS, previous_src, report=True)
+
+    def case_detail_rendered(self):
+        return self.script("case_detail", CASE_DETAIL_RENDERED_JS)
+
+    def result_rows(self):
+        return self.script("result_rows", RESULT_ROWS_JS)
+
+    def summary(self):
+        """
+        Current timeout and smoothed latency of every court and signal seen.
+
+        Returns:
+        dict: (court, signal) -> {"timeout": float, "latency": float or None}
+        """
+        with self._lock:
+            return {key: {"timeout": est.timeout(), "latency": est.srtt} for key, est in self.estimators.items()}
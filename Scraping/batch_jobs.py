@@ -0,0 +1,238 @@
+"""
+Batch mode: many acts × sections × courts × case statuses from one job file.
+
+The plan is ordered court first, then case status, then act and section, so
+the court is selected once and every further query of it only changes the
+act, section or status on the form already loaded (Get_court_data.search_again).
+Moving to disposed once per court never needs switching back to pending.
+
+A case matched by several sections is scraped once: its CNR is looked up
+before "View" is clicked, and later matches are only recorded in the
+optional matches file.
+
+Job file:
+    {
+        "acts": [{"name": "Indian Penal Code", "sections": ["376", "376D", "354"]}],
+        "courts": [{"state_code": "18", "dist_code": "3",
+                    "court_complex_code": "1180029@1,2,10,11@Y", "est_code": "1"}],
+        "statuses": ["pending", "disposed"],
+        "filters": {"year_from": 2024, "year_to": 2024}
+    }
+
+Instead of "courts", "courts_csv" names a file as for crawl_pool, or
+"court_lookup" holds state, district, complex and establishment to look up in
+the court index.
+
+Usage:
+    python batch_jobs.py jobs.json --output batch_cases.csv [--checkpoint checkpoint.sqlite3] [--matches matches.csv]
+"""
+import argparse
+import csv
+import json
+import os
+
+import Get_court_data as court_data
+from case_fields import ALL_FIELDS
+from checkpoint_store import CheckpointStore, court_key
+from court_index import INDEX_FILE, find_courts, get_index
+from crawl_pool import CASE_STATUSES, LABEL_FIELDS, load_courts
+from output_sinks import open_sink
+from page_archive import PageArchive
+from search_results import make_row_filter
+from tracing import tracer
+
+BATCH_LABEL_FIELDS = LABEL_FIELDS + ["Act", "Section"]
+
+
+def load_job(filename):
+    """
+    Read a job file and resolve its courts.
+
+    Returns:
+    dict: The job with "acts" as (act, section) pairs and "courts" as court dicts
+    """
+    with open(filename, encoding="utf-8") as file:
+        job = json.load(file)
+
+    queries = []
+    for act in job["acts"]:
+        for section in act["sections"]:
+            if (act["name"], str(section)) not in queries:
+                queries.append((act["name"], str(section)))
+    job["acts"] = queries
+
+    if "courts_csv" in job:
+        job["courts"] = load_courts(job["courts_csv"])
+    elif "court_lookup" in job:
+        lookup = job["court_lookup"]
+        state = lookup.get("state")
+        state_codes = [str(state)] if state and str(state).isdigit() else None
+        job["courts"] = find_courts(get_index(job.get("court_index", INDEX_FILE), state_codes=state_codes),
+                                    state, lookup.get("district"), lookup.get("complex"),
+                                    lookup.get("establishment"))
+    job.setdefault("statuses", list(CASE_STATUSES))
+    job.setdefault("filters", {})
+    return job
+
+
+def plan_queries(courts, queries, statuses=CASE_STATUSES):
+    """
+    Order the searches so each court is selected once and each case status
+    switched to once per court.
+
+    Returns:
+    list: (court dict, case status, act, section) tuples in crawl order
+    """
+    statuses = [status for status in CASE_STATUSES if status in statuses]
+    return [
+        (court, case_status, act, section)
+        for court in courts
+        for case_status in statuses
+        for act, section in queries
+    ]
+
+
+class CaseDeduplicator:
+    """
+    Stands in for the CheckpointStore and the sink of process_search_results,
+    so a case is scraped only the first time any query matches it.
+
+    process_search_results asks has_case for every matching row before its
+    details are fetched, which is where the queries each CNR appeared under
+    are recorded. Each case is written to the sink, labelled with the current
+    query, as soon as it is scraped and before it is recorded in the store.
+
+    Parameters:
+    store (CheckpointStore): Also skip and record cases here, None for this run only
+    sink: Output sink the labelled cases are written to
+    """
+
+    def __init__(self, store=None, sink=None):
+        self.store = store
+        self.sink = sink
+        self.scraped = set()
+        self.matches = {}
+        self.query = None
+        self.labels = {}
+
+    def has_case(self, cnr):
+        self.matches.setdefault(cnr, []).append(self.query)
+        return cnr in self.scraped or (self.store is not None and self.store.has_case(cnr))
+
+    def write(self, case):
+        self.sink.write({**self.labels, **case})
+
+    def save_case(self, cnr, *args):
+        self.scraped.add(cnr)
+        if self.store is not None:
+            self.store.save_case(cnr, *args)
+
+    def write_matches(self, filename):
+        """
+        Write every (CNR, court, status, act, section) match found, including
+        the ones that were not scraped again.
+        """
+        with open(filename, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["CNR Number", "Court", "Case Status Searched", "Act", "Section"])
+            for cnr, queries in self.matches.items():
+                for query in queries:
+                    writer.writerow([cnr, *query])
+        print(f"Matches saved to {filename}")
+
+
+def run_batch(plan, sink, store=None, archive=None, filter_options=None, prefetch=0):
+    """
+    Run the planned searches in this process's browser, writing each new
+    case to the sink labelled with its court, status, act and section as
+    soon as it is scraped.
+
+    Searches a store has marked done are skipped, and a search that fails,
+    whatever the error, is not marked done, so rerunning the job retries it
+    while the rest of the plan goes on. prefetch is the in-page
+    detail fetch concurrency, 0 to click "View" for each case.
+
+    Returns:
+    CaseDeduplicator: The CNRs seen, with the queries that matched them
+    """
+    dedup = CaseDeduplicator(store, sink)
+    row_filter = make_row_filter(**(filter_options or {}))
+    current = None
+    for court, case_status, act, section in plan:
+        codes = (court["state_code"], court["dist_code"], court["court_complex_code"], court["est_code"])
+        key = court_key(*codes)
+        if store is not None and store.is_court_done(key, act, section, case_status):
+            print(f"Skipping {act} {section} {case_status} in {key}, already done")
+            continue
+        print(f"Searching {act} {section} {case_status} in {key}")
+        dedup.query = (key, case_status, act, section)
+        dedup.labels = dict(zip(BATCH_LABEL_FIELDS, (*codes, case_status, act, section)))
+        if store is not None:
+            store.start_court(key, act, section, case_status)
+
+        try:
+            if current != key:
+                # New court: select it once, later queries reuse the loaded form
+                current = None
+                found = court_data.access_court_services(act, section, *codes, case_status)
+                current = key
+            else:
+                found = court_data.search_again(act, section, case_status)
+            if not found:
+                raise court_data.SearchFailed("Search did not bring up results")
+            court_data.process_search_results(case_status, sink=dedup, store=dedup, court=key,
+                                              row_filter=row_filter, archive=archive, prefetch=prefetch,
+                                              act_name=act, section_number=section)
+        except Exception as e:
+            # Left unfinished for a resumed run; reload the court for the next query
+            print(f"Search {act} {section} {case_status} in {key} failed: {str(e)}")
+            current = None
+            continue
+        if store is not None:
+            store.finish_court(key, act, section, case_status)
+    return dedup
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many act, section, court and status searches from a job file.")
+    parser.add_argument("job", help="JSON job file")
+    parser.add_argument("--output", default="batch_cases.csv", help="Output file, .csv, .jsonl or .parquet")
+    parser.add_argument("--checkpoint", default=None,
+                        help="SQLite checkpoint file to resume from and skip already scraped cases")
+    parser.add_argument("--archive", default=None, help="Directory to archive raw case detail pages in")
+    parser.add_argument("--matches", default=None, help="CSV file listing every query each CNR matched")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Fetch this many case details at once inside the page instead of clicking View")
+    parser.add_argument("--lean", action="store_true",
+                        help="Run headless and block images, fonts and stylesheets")
+    parser.add_argument("--attach", default=None, help="Debugger address of a warm browser to use")
+    parser.add_argument("--trace", default=None, help="Write per-stage timing spans to this JSON trace file")
+    parser.add_argument("--metrics", default=None, help="Write a Prometheus-style timing summary to this file")
+    args = parser.parse_args()
+
+    job = load_job(args.job)
+    # A missing index is built in a browser started with other settings
+    court_data.quit_driver()
+    plan = plan_queries(job["courts"], job["acts"], job["statuses"])
+    print(f"{len(plan)} searches in {len(job['courts'])} courts")
+
+    court_data.start_driver(lean=args.lean, debugger_address=args.attach)
+    store = CheckpointStore(args.checkpoint) if args.checkpoint else None
+    archive = PageArchive(args.archive) if args.archive else None
+    append = bool(args.checkpoint) and os.path.exists(args.output)
+    try:
+        with open_sink(args.output, BATCH_LABEL_FIELDS + ALL_FIELDS, append=append) as sink:
+            dedup = run_batch(plan, sink, store, archive, job["filters"], args.prefetch)
+        print(f"{sink.count} cases written to {args.output}, "
+              f"{sum(len(queries) for queries in dedup.matches.values())} matches of {len(dedup.matches)} cases")
+        if args.matches:
+            dedup.write_matches(args.matches)
+    finally:
+        if store is not None:
+            store.close()
+        court_data.quit_driver()
+
+    if args.trace:
+        tracer.export_trace(args.trace)
+    if args.metrics:
+        tracer.export_metrics(args.metrics)
@@ -0,0 +1,168 @@
+"""
+Offline accuracy and latency benchmark for the captcha solver.
+
+Runs every preprocessing/OCR configuration over a folder of labelled captcha
+images and reports accuracy, p50/p95 latency and throughput for each one,
+then the same for the parallel ensemble (captcha_solver.read_captcha_bytes)
+with how many captchas it would refresh instead of submitting and how often
+the ones it submits are right, to tune CAPTCHA_MIN_SCORE.
+The label of an image is taken from labels.csv in the folder (columns
+filename,label) if present, otherwise from the file name, e.g. cw6g23.png.
+
+Usage:
+    python bench_captcha.py [captchas/] [--ignore-case] [--attempts 3]
+"""
+import argparse
+import csv
+import itertools
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from captcha_solver import (CAPTCHA_MIN_SCORE, CAPTCHA_WHITELIST, OcrEngine, image_from_bytes,  # noqa: E402
+                            preprocess, read_captcha_bytes)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp")
+
+THRESHOLDS = (None, 128, 160)
+DENOISE = (False, True)
+PSM_MODES = (6, 7, 8)
+WHITELISTS = (CAPTCHA_WHITELIST, None)
+
+
+def load_corpus(folder):
+    """
+    Load the labelled captcha images of a folder.
+
+    Returns:
+    list: (label, image bytes) pairs
+    """
+    labels = {}
+    labels_file = os.path.join(folder, "labels.csv")
+    if os.path.exists(labels_file):
+        with open(labels_file, newline='', encoding='utf-8') as file:
+            labels = {row["filename"]: row["label"] for row in csv.DictReader(file)}
+
+    corpus = []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        label = labels.get(filename, os.path.splitext(filename)[0])
+        with open(os.path.join(folder, filename), "rb") as file:
+            corpus.append((label, file.read()))
+    return corpus
+
+
+def run_config(corpus, threshold, denoise, psm, whitelist, ignore_case):
+    """
+    Solve every captcha of the corpus with one configuration.
+
+    Returns:
+    dict: Accuracy, latency percentiles in ms and throughput in captchas/s
+    """
+    engine = OcrEngine(psm=psm, whitelist=whitelist)
+    # Warm up so engine start-up is not billed to the first image
+    engine.recognize(preprocess(image_from_bytes(corpus[0][1])))
+
+    correct = 0
+    latencies = []
+    started = time.perf_counter()
+    for label, img_bytes in corpus:
+        start = time.perf_counter()
+        image = preprocess(image_from_bytes(img_bytes), threshold=threshold, denoise=denoise)
+        text = engine.recognize(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if ignore_case:
+            correct += text.lower() == label.lower()
+        else:
+            correct += text == label
+    elapsed = time.perf_counter() - started
+    engine.close()
+
+    latencies.sort()
+    return {
+        "accuracy": correct / len(corpus),
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "throughput": len(corpus) / elapsed if elapsed else float("inf"),
+    }
+
+
+def run_ensemble(corpus, ignore_case, min_score=CAPTCHA_MIN_SCORE):
+    """
+    Solve every captcha of the corpus with the parallel ensemble.
+
+    Returns:
+    dict: Accuracy, latency percentiles in ms, throughput in captchas/s, the
+    share of captchas scoring below min_score and the accuracy of the rest
+    """
+    # Warm up so pool and engine start-up are not billed to the first image
+    read_captcha_bytes(corpus[0][1])
+
+    correct = 0
+    submitted = 0
+    submitted_correct = 0
+    latencies = []
+    started = time.perf_counter()
+    for label, img_bytes in corpus:
+        start = time.perf_counter()
+        reading = read_captcha_bytes(img_bytes)
+        latencies.append((time.perf_counter() - start) * 1000)
+        right = reading["text"] == (label.lower() if ignore_case else label)
+        correct += right
+        if reading["score"] >= min_score:
+            submitted += 1
+            submitted_correct += right
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "accuracy": correct / len(corpus),
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "throughput": len(corpus) / elapsed if elapsed else float("inf"),
+        "refreshed": 1 - submitted / len(corpus),
+        "submitted_accuracy": submitted_correct / submitted if submitted else float("nan"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark captcha preprocessing and OCR configurations.")
+    parser.add_argument("folder", nargs="?", default=os.path.join(HERE, "captchas"),
+                        help="Folder of labelled captcha images")
+    parser.add_argument("--ignore-case", action="store_true", help="Compare text case-insensitively")
+    parser.add_argument("--attempts", type=int, default=3,
+                        help="Captcha attempts the scraper allows, for the success estimate")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.folder)
+    if not corpus:
+        sys.exit(f"No captcha images found in {args.folder}")
+
+    results = []
+    for threshold, denoise, psm, whitelist in itertools.product(THRESHOLDS, DENOISE, PSM_MODES, WHITELISTS):
+        stats = run_config(corpus, threshold, denoise, psm, whitelist, args.ignore_case)
+        results.append(((threshold, denoise, psm, whitelist is not None), stats))
+
+    # Best accuracy first, then lowest median latency
+    results.sort(key=lambda item: (-item[1]["accuracy"], item[1]["p50"]))
+
+    print(f"{len(corpus)} captchas, {OcrEngine().backend} backend")
+    print(f"{'threshold':>9} {'denoise':>7} {'psm':>3} {'whitelist':>9} "
+          f"{'accuracy':>8} {'p50 ms':>8} {'p95 ms':>8} {'per s':>7} {'tries':>6} {'ok in ' + str(args.attempts):>7}")
+    for (threshold, denoise, psm, whitelist), stats in results:
+        accuracy = stats["accuracy"]
+        expected_tries = 1 / accuracy if accuracy else float("inf")
+        success = 1 - (1 - accuracy) ** args.attempts
+        print(f"{str(threshold):>9} {str(denoise):>7} {psm:>3} {str(whitelist):>9} "
+              f"{accuracy:8.1%} {stats['p50']:8.1f} {stats['p95']:8.1f} {stats['throughput']:7.1f} "
+              f"{expected_tries:6.2f} {success:7.1%}")
+
+    stats = run_ensemble(corpus, args.ignore_case)
+    print(f"\nEnsemble: {stats['accuracy']:.1%} accuracy, p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms, "
+          f"{stats['throughput']:.1f} per s; {stats['refreshed']:.1%} refreshed below score {CAPTCHA_MIN_SCORE}, "
+          f"{stats['submitted_accuracy']:.1%} of the submitted ones right")
@@ -0,0 +1,84 @@
+"""
+Benchmark per-case field extraction on a saved case detail page.
+
+Compares the old path, one find_element call per field, with the batched
+path that pulls every field in a single execute_script call.
+
+Usage:
+    python bench_case_details.py [--page case_detail_pending.html] [--status pending] [--runs 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from case_fields import FIELD_MAPS, extract_case_fields  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def extract_per_element(driver, case_status):
+    """
+    The old extraction path: one WebDriver round trip per field.
+    """
+    table = driver.find_element(By.XPATH, '//*[@id="CSact"]/table[1]')
+    case_details = {}
+    for field, xpath in FIELD_MAPS[case_status].items():
+        try:
+            case_details[field] = table.find_element(By.XPATH, xpath).text.strip()
+        except Exception:
+            case_details[field] = "N/A"
+    return case_details
+
+
+def time_runs(func, driver, case_status, runs):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func(driver, case_status)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<14} mean {statistics.mean(timings):8.2f} ms   "
+          f"median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark case detail field extraction.")
+    parser.add_argument("--page", default=os.path.join(HERE, "case_detail_pending.html"),
+                        help="Saved case detail page")
+    parser.add_argument("--status", choices=sorted(FIELD_MAPS), default="pending",
+                        help="Field map to extract")
+    parser.add_argument("--runs", type=int, default=50, help="Extractions per path")
+    args = parser.parse_args()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get("file://" + os.path.abspath(args.page))
+
+        old_timings, old_result = time_runs(extract_per_element, driver, args.status, args.runs)
+        new_timings, new_result = time_runs(extract_case_fields, driver, args.status, args.runs)
+
+        print(f"{len(FIELD_MAPS[args.status])} fields, {args.runs} runs per path")
+        report("find_element", old_timings)
+        report("execute_script", new_timings)
+        print(f"speedup        {statistics.median(old_timings) / statistics.median(new_timings):8.1f}x")
+
+        mismatched = [field for field in old_result if old_result[field] != new_result.get(field)]
+        if mismatched:
+            print(f"Fields that differ between paths: {mismatched}")
+    finally:
+        driver.quit()
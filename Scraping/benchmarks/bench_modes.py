@@ -0,0 +1,202 @@
+"""
+End-to-end throughput benchmark of the scraping modes against the local stand-in.
+
+Starts mock_ecourts with the given result size and injected latency, then
+runs each mode in its own process so memory is measured separately, and
+reports cases/minute, p50/p95 per-case latency and peak memory.
+
+Modes:
+    http              http_backend, no browser
+    browser           Selenium, clicking "View" for every case
+    browser-prefetch  Selenium, details fetched concurrently inside the page
+    browser-lean      Selenium with the lean headless profile and resource blocking
+
+Per-case latency is the "row" span of each case: its request and
+extraction, or its click, page and back navigation. In browser-prefetch the
+details of a batch are fetched together before the rows are extracted, so
+each case there counts the batch's whole fetch plus its own extraction.
+
+Peak memory covers this process and, with psutil installed, the browser's
+processes as well; without psutil it is the Python process only.
+
+Usage:
+    python bench_modes.py [--modes http,browser,browser-prefetch] [--cases 50] [--latency 0.05] [--skip-ocr]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRAPING_DIR)
+
+MODES = ("http", "browser", "browser-prefetch", "browser-lean")
+
+
+class MemorySampler:
+    """
+    Samples the resident memory of this process and its browser in the background.
+    """
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.driver = None
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        from browser_profile import browser_memory_mb, psutil
+
+        if psutil is not None:
+            memory = psutil.Process().memory_info().rss / (1024 * 1024)
+        else:
+            # Unix only; ru_maxrss is the peak so far, in KB on Linux
+            import resource
+
+            memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        if self.driver is not None:
+            memory += browser_memory_mb(self.driver) or 0
+        self.peak_mb = max(self.peak_mb, memory)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._sample()
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def case_latencies(spans):
+    """
+    Seconds each case took, from the tracer's spans in the order they ended.
+
+    A "prefetch" span ends before the "row" spans of its batch, and its
+    duration is added to each of them.
+    """
+    latencies = []
+    batch_seconds = 0.0
+    for span in spans:
+        if span["stage"] == "prefetch":
+            batch_seconds = span["duration"]
+        elif span["stage"] == "row":
+            latencies.append(batch_seconds + span["duration"])
+    return latencies
+
+
+def run_mode(mode, site_url, prefetch, skip_ocr):
+    """
+    Scrape every case of the default court once in the given mode.
+
+    Returns:
+    dict: Cases scraped, wall time, per-case latencies and peak memory
+    """
+    os.environ["ECOURTS_SITE_URL"] = site_url
+    import Get_court_data as court_data
+    import http_backend
+    from search_results import make_row_filter
+    from tracing import tracer
+
+    if skip_ocr:
+        # The stand-in accepts any captcha text unless started with one
+        reading = {"text": "bench1", "confidence": 100.0, "score": 100.0, "variant": {}}
+        court_data.read_captcha = lambda data_url: reading
+        http_backend.read_captcha_bytes = lambda img_bytes: reading
+    row_filter = make_row_filter(None, None)
+
+    with MemorySampler() as sampler:
+        started = time.perf_counter()
+        if mode == "http":
+            with http_backend.EcourtsHttpClient(site_url + "ecourtindia_v6/") as client:
+                cases = list(http_backend.scrape_cases(client, row_filter=row_filter))
+        else:
+            sampler.driver = court_data.start_driver(lean=mode == "browser-lean")
+            try:
+                court_data.access_court_services()
+                cases = court_data.process_search_results(
+                    "pending", row_filter=row_filter, prefetch=prefetch if mode == "browser-prefetch" else 0)
+            finally:
+                sampler.driver = None
+                court_data.quit_driver()
+        seconds = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "cases": len(cases),
+        "seconds": seconds,
+        "latencies": case_latencies(tracer.spans),
+        "peak_memory_mb": sampler.peak_mb,
+    }
+
+
+def run_in_subprocess(mode, site_url, prefetch, skip_ocr):
+    """
+    Run one mode in a fresh Python process and return its result dict.
+    """
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--site-url", site_url,
+               "--prefetch", str(prefetch)]
+    if skip_ocr:
+        command.append("--skip-ocr")
+    completed = subprocess.run(command, cwd=SCRAPING_DIR, capture_output=True, text=True)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    print(completed.stdout[-2000:])
+    print(completed.stderr[-2000:])
+    return {"mode": mode, "error": f"exit code {completed.returncode}"}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float("nan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraping modes against the local stand-in.")
+    parser.add_argument("--modes", default="http,browser,browser-prefetch",
+                        help=f"Comma separated modes out of {', '.join(MODES)}")
+    parser.add_argument("--cases", type=int, default=50, help="Result rows per search")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the stand-in adds to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--prefetch", type=int, default=4, help="Concurrency of browser-prefetch")
+    parser.add_argument("--skip-ocr", action="store_true", help="Send a fixed captcha text instead of running OCR")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--site-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.site_url, args.prefetch, args.skip_ocr)))
+        sys.exit(0)
+
+    from mock_ecourts import start_server
+
+    server = start_server(cases=args.cases, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate)
+    site_url = server.base_url[:-len("ecourtindia_v6/")]
+    print(f"Stand-in at {site_url} with {args.cases} cases, {args.latency * 1000:.0f} ms latency")
+
+    print(f"{'mode':>17} {'cases':>6} {'seconds':>8} {'cases/min':>10} {'p50 ms':>8} {'p95 ms':>8} {'peak MB':>8}")
+    for mode in args.modes.split(","):
+        result = run_in_subprocess(mode.strip(), site_url, args.prefetch, args.skip_ocr)
+        if "error" in result:
+            print(f"{result['mode']:>17} failed: {result['error']}")
+            continue
+        latencies = result["latencies"]
+        per_minute = result["cases"] / result["seconds"] * 60 if result["seconds"] else 0
+        print(f"{result['mode']:>17} {result['cases']:6d} {result['seconds']:8.2f} {per_minute:10.1f} "
+              f"{percentile(latencies, 0.5) * 1000:8.1f} {percentile(latencies, 0.95) * 1000:8.1f} "
+              f"{result['peak_memory_mb']:8.1f}")
+    server.shutdown()
@@ -0,0 +1,115 @@
+"""
+Lean Chrome profile and driver recycling for long crawls.
+
+The lean profile runs headless and blocks images, fonts and stylesheets
+through the DevTools protocol. The captcha is served by securimage_show.php,
+not as an image file, so it still loads. A DriverRecycler decides when a
+session has scraped enough cases, or its browser uses too much memory, to be
+replaced by a fresh one.
+
+psutil is optional; without it recycling only counts cases.
+"""
+from selenium import webdriver
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Resources the scraper never reads. "captcha_image" is loaded from
+# vendor/securimage/securimage_show.php and matches none of these.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.css",
+]
+
+
+def chrome_options(lean=False):
+    """
+    Chrome options for the normal, visible profile or the lean headless one.
+    """
+    options = webdriver.ChromeOptions()
+    if not lean:
+        options.add_argument('--start-maximized')
+        return options
+    options.add_argument('--headless=new')
+    options.add_argument('--window-size=1366,900')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-background-networking')
+    options.add_argument('--mute-audio')
+    options.add_argument('--no-first-run')
+    return options
+
+
+def block_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """
+    Stop the browser from downloading resources matching the URL patterns.
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def browser_memory_mb(driver):
+    """
+    Resident memory of the chromedriver process and every browser process
+    under it, in MB.
+
+    Returns:
+    float: Memory in MB, or None without psutil or a local chromedriver
+    """
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+class DriverRecycler:
+    """
+    Decides when the current browser session should be replaced.
+
+    Parameters:
+    max_cases (int): Recycle after this many cases, None for no limit
+    max_memory_mb (float): Recycle when the browser uses more memory, None for no limit
+    check_every (int): Measure memory every this many cases
+    """
+
+    def __init__(self, max_cases=None, max_memory_mb=None, check_every=10):
+        self.max_cases = max_cases
+        self.max_memory_mb = max_memory_mb
+        self.check_every = check_every
+        self.cases = 0
+        self.recycled = 0
+
+    def case_done(self):
+        self.cases += 1
+
+    def due(self, driver):
+        """
+        True if the session has done max_cases cases or exceeds max_memory_mb.
+        """
+        if self.max_cases and self.cases >= self.max_cases:
+            print(f"Recycling browser after {self.cases} cases")
+            return True
+        if self.max_memory_mb and self.cases and self.cases % self.check_every == 0:
+            memory = browser_memory_mb(driver)
+            if memory is not None and memory > self.max_memory_mb:
+                print(f"Recycling browser using {memory:.0f} MB")
+                return True
+        return False
+
+    def reset(self):
+        self.cases = 0
+        self.recycled += 1
@@ -0,0 +1,113 @@
+"""
+Warm Chrome instances for scraping jobs to attach to.
+
+Launching Chrome and loading the eCourts page takes seconds, which dominates
+short jobs. This keeps a pool of browsers running with remote debugging on
+consecutive ports, already on the case status site; jobs attach to them
+through chromedriver's debuggerAddress instead of starting their own.
+
+Usage:
+    python browser_session.py --count 4 [--base-port 9222] [--lean]
+    python crawl_pool.py courts.csv --attach 127.0.0.1:9222 --attach 127.0.0.1:9223 ...
+    CHROME_DEBUGGER_ADDRESS=127.0.0.1:9222 python Get_court_data.py
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+from browser_profile import chrome_options
+
+START_URL = "https://services.ecourts.gov.in/"
+
+CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+WINDOWS_CHROME = r'C:/Program Files/Google/Chrome/Application/chrome.exe'
+
+
+def find_chrome():
+    """
+    Path of the Chrome binary: CHROME_BINARY if set, else the first Chrome
+    or Chromium on PATH, else the default Windows install location.
+    """
+    binary = os.environ.get("CHROME_BINARY")
+    if binary:
+        return binary
+    for name in CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    if os.name == "nt" and os.path.exists(WINDOWS_CHROME):
+        return WINDOWS_CHROME
+    raise FileNotFoundError("Chrome not found, set CHROME_BINARY")
+
+
+def launch_browser(port, profile_dir, lean=False, url=START_URL):
+    """
+    Start Chrome with remote debugging on a port and its own profile directory.
+
+    Returns:
+    subprocess.Popen: The browser process
+    """
+    args = [find_chrome(), f"--remote-debugging-port={port}", f"--user-data-dir={profile_dir}",
+            "--no-first-run", "--no-default-browser-check"]
+    if lean:
+        args += chrome_options(lean=True).arguments
+    return subprocess.Popen(args + [url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(port, timeout=30):
+    """
+    Wait until the browser answers on its debugging port.
+
+    Returns:
+    dict: The browser's /json/version description
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1) as response:
+                return json.load(response)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Browser on port {port} did not start")
+            time.sleep(0.1)
+
+
+def warm_pool(count, base_port=9222, lean=False, root=None):
+    """
+    Launch count browsers on ports base_port, base_port + 1, ...
+
+    Returns:
+    tuple: Debugger addresses ("127.0.0.1:port") and the browser processes
+    """
+    root = root or tempfile.mkdtemp(prefix="ecourts_browsers_")
+    addresses, processes = [], []
+    for port in range(base_port, base_port + count):
+        processes.append(launch_browser(port, os.path.join(root, str(port)), lean))
+    for port in range(base_port, base_port + count):
+        wait_until_ready(port)
+        addresses.append(f"127.0.0.1:{port}")
+    return addresses, processes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep warm Chrome instances for scraping jobs to attach to.")
+    parser.add_argument("--count", type=int, default=2, help="Number of browsers")
+    parser.add_argument("--base-port", type=int, default=9222, help="Remote debugging port of the first browser")
+    parser.add_argument("--lean", action="store_true", help="Run the browsers headless")
+    args = parser.parse_args()
+
+    addresses, processes = warm_pool(args.count, args.base_port, args.lean)
+    print("Warm browsers: " + " ".join(f"--attach {address}" for address in addresses))
+    try:
+        while all(process.poll() is None for process in processes):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
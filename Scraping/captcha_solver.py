@@ -0,0 +1,344 @@
+"""
+In-memory captcha OCR with a long-lived engine.
+
+The captcha goes from the canvas data URL to decoded bytes to a PIL image to
+text without touching the disk, so parallel workers never share a file.
+
+If the optional tesserocr package is installed, the engine keeps one
+Tesseract API instance per thread alive across calls instead of starting a
+tesseract process for every attempt. Without it the engine falls back to
+pytesseract, using the tesseract binary named by the TESSERACT_CMD
+environment variable, or found on PATH.
+
+read_captcha_bytes runs an ensemble instead of one guess: every variant in
+CAPTCHA_VARIANTS (scaling, thresholds, denoising) is recognized in parallel
+on a process pool, and each text is scored by Tesseract's confidence and by
+how well it fits the expected captcha (CAPTCHA_LENGTH characters out of
+CAPTCHA_CHARSET). Callers can refresh a captcha whose best score is below
+CAPTCHA_MIN_SCORE instead of submitting a likely wrong guess.
+"""
+import base64
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from PIL import Image, ImageFilter
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+CAPTCHA_WHITELIST = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+# What the site's captchas look like: six lowercase letters and digits
+CAPTCHA_LENGTH = 6
+CAPTCHA_CHARSET = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+# Best score (0-100) below which a captcha is refreshed rather than submitted
+CAPTCHA_MIN_SCORE = 60
+
+# preprocess() arguments of the ensemble, the raw image first
+CAPTCHA_VARIANTS = (
+    {},
+    {"scale": 2},
+    {"scale": 2, "threshold": 140},
+    {"scale": 2, "threshold": 110, "denoise": True},
+    {"scale": 3, "denoise": True},
+)
+
+# Where the Windows installer puts tesseract, used there when TESSERACT_CMD is not set
+WINDOWS_TESSERACT_CMD = r'C:/Program Files/Tesseract-OCR/tesseract.exe'
+
+
+def configure_tesseract():
+    """
+    Point pytesseract at the tesseract binary from TESSERACT_CMD, or on
+    Windows at the installer's default location if it exists. Otherwise
+    tesseract is looked up on PATH.
+
+    Returns:
+    str: The tesseract command pytesseract will run
+    """
+    cmd = os.environ.get("TESSERACT_CMD")
+    if not cmd and os.name == "nt" and os.path.exists(WINDOWS_TESSERACT_CMD):
+        cmd = WINDOWS_TESSERACT_CMD
+    if cmd:
+        pytesseract.pytesseract.tesseract_cmd = cmd
+    return pytesseract.pytesseract.tesseract_cmd
+
+
+def decode_data_url(data_url):
+    """
+    Decode a "data:image/png;base64,..." URL, or bare base64, into bytes.
+    """
+    if data_url.startswith("data:"):
+        data_url = data_url.split(",", 1)[1]
+    return base64.b64decode(data_url)
+
+
+def image_from_bytes(img_bytes):
+    """
+    Open image bytes as a PIL image without writing them to disk.
+    """
+    image = Image.open(io.BytesIO(img_bytes))
+    image.load()
+    return image
+
+
+def preprocess(image, threshold=None, denoise=False, scale=1):
+    """
+    Clean up a captcha image before OCR.
+
+    Parameters:
+    image (PIL.Image.Image): The captcha image
+    threshold (int): Binarize at this grey level (0-255), None to keep greyscale
+    denoise (bool): Apply a 3x3 median filter to remove speckles
+    scale (int): Upscale factor, Tesseract reads small glyphs better when larger
+
+    Returns:
+    PIL.Image.Image: The processed greyscale image
+    """
+    if image.mode in ("RGBA", "LA", "P"):
+        # Transparent canvas pixels are black in RGB, paint them white first
+        background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+        background.alpha_composite(image.convert("RGBA"))
+        image = background
+    image = image.convert("L")
+    if scale and scale != 1:
+        image = image.resize((image.width * scale, image.height * scale), Image.LANCZOS)
+    if denoise:
+        image = image.filter(ImageFilter.MedianFilter(3))
+    if threshold is not None:
+        image = image.point(lambda value: 255 if value > threshold else 0)
+    return image
+
+
+class OcrEngine:
+    """
+    Reusable OCR engine for captcha images.
+
+    Safe to share between threads: with tesserocr every thread gets its own
+    Tesseract API instance, created on first use and kept for the life of
+    the engine.
+
+    Parameters:
+    psm (int): Tesseract page segmentation mode
+    oem (int): Tesseract OCR engine mode
+    whitelist (str): Characters Tesseract may return, None for no restriction
+    """
+
+    def __init__(self, psm=6, oem=3, whitelist=CAPTCHA_WHITELIST):
+        self.psm = psm
+        self.oem = oem
+        self.whitelist = whitelist
+        self.backend = "tesserocr" if tesserocr is not None else "pytesseract"
+        if self.backend == "pytesseract":
+            configure_tesseract()
+        self._local = threading.local()
+        self._apis = []
+        self._apis_lock = threading.Lock()
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(psm=self.psm, oem=self.oem)
+            if self.whitelist:
+                api.SetVariable("tessedit_char_whitelist", self.whitelist)
+            self._local.api = api
+            with self._apis_lock:
+                self._apis.append(api)
+        return api
+
+    def _config(self):
+        config = f"--oem {self.oem} --psm {self.psm}"
+        if self.whitelist:
+            config += f" -c tessedit_char_whitelist={self.whitelist}"
+        return config
+
+    def recognize(self, image):
+        """
+        Run OCR on a PIL image.
+
+        Returns:
+        str: The recognized text, stripped
+        """
+        if self.backend == "tesserocr":
+            api = self._api()
+            api.SetImage(image)
+            return api.GetUTF8Text().strip()
+        return pytesseract.image_to_string(image, config=self._config()).strip()
+
+    def recognize_with_confidence(self, image):
+        """
+        Run OCR on a PIL image and report how sure Tesseract is.
+
+        Returns:
+        tuple: (text, mean word confidence from 0 to 100)
+        """
+        if self.backend == "tesserocr":
+            api = self._api()
+            api.SetImage(image)
+            return api.GetUTF8Text().strip(), float(api.MeanTextConf())
+        data = pytesseract.image_to_data(image, config=self._config(), output_type=pytesseract.Output.DICT)
+        words = [(text.strip(), float(conf)) for text, conf in zip(data["text"], data["conf"])
+                 if text.strip() and float(conf) >= 0]
+        if not words:
+            return "", 0.0
+        return "".join(text for text, _ in words), sum(conf for _, conf in words) / len(words)
+
+    def close(self):
+        """
+        Release the Tesseract API instances held by the engine.
+        """
+        with self._apis_lock:
+            for api in self._apis:
+                api.End()
+            self._apis = []
+        self._local = threading.local()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Return the process-wide OCR engine, creating it on first use, so
+    importing the scraper never touches tesseract.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OcrEngine()
+    return _engine
+
+
+def solve_captcha(data_url, engine=None, **preprocessing):
+    """
+    Read the text of a captcha given as a data URL or base64 string.
+
+    Parameters:
+    data_url (str): Canvas data URL of the captcha image
+    engine (OcrEngine): Engine to use, the process-wide engine by default
+    preprocessing: Keyword arguments for preprocess(), none by default
+
+    Returns:
+    str: The captcha text
+    """
+    return solve_captcha_bytes(decode_data_url(data_url), engine, **preprocessing)
+
+
+def solve_captcha_bytes(img_bytes, engine=None, **preprocessing):
+    """
+    Read the text of a captcha given as raw image bytes.
+    """
+    image = image_from_bytes(img_bytes)
+    if preprocessing:
+        image = preprocess(image, **preprocessing)
+    return (engine or get_engine()).recognize(image)
+
+
+def score_candidate(text, confidence, length=CAPTCHA_LENGTH, charset=CAPTCHA_CHARSET):
+    """
+    Score an OCR reading of a captcha from 0 to 100.
+
+    The confidence is scaled down by the share of characters outside charset
+    and by how far the length is from the expected one, so a confident
+    reading of the wrong shape still scores low.
+    """
+    if not text:
+        return 0.0
+    in_charset = sum(char in charset for char in text) / len(text)
+    length_fit = max(0.0, 1 - abs(len(text) - length) / length)
+    return confidence * in_charset * length_fit
+
+
+def normalise_candidate(text):
+    """
+    Drop whitespace and lowercase an OCR reading; the site's captchas are
+    lowercase, and Tesseract often reads c, o, s, w, x or z as capitals.
+    """
+    return "".join(text.split()).lower()
+
+
+def _reset_engine():
+    # Pool workers start with no engine of their own, even when forked from
+    # a process that had one
+    global _engine
+    _engine = None
+
+
+def _recognize_variant(img_bytes, variant):
+    image = preprocess(image_from_bytes(img_bytes), **variant)
+    text, confidence = get_engine().recognize_with_confidence(image)
+    text = normalise_candidate(text)
+    return {"text": text, "confidence": confidence, "score": score_candidate(text, confidence), "variant": variant}
+
+
+_ensemble_pool = None
+_ensemble_pool_lock = threading.Lock()
+
+
+def get_ensemble_pool(workers=None):
+    """
+    Return the process-wide pool the ensemble runs on, creating it on first use.
+
+    Daemonic processes, such as crawl_pool's workers, may not start child
+    processes, so there the pool is a thread pool: tesserocr releases the
+    GIL while recognizing and pytesseract runs tesseract as a subprocess, so
+    the variants still run in parallel.
+
+    Parameters:
+    workers (int): Pool size, one per variant up to the CPU count by default
+    """
+    global _ensemble_pool
+    if _ensemble_pool is None:
+        with _ensemble_pool_lock:
+            if _ensemble_pool is None:
+                workers = workers or min(len(CAPTCHA_VARIANTS), os.cpu_count() or 1)
+                if multiprocessing.current_process().daemon:
+                    _ensemble_pool = ThreadPoolExecutor(workers)
+                else:
+                    _ensemble_pool = ProcessPoolExecutor(workers, initializer=_reset_engine)
+    return _ensemble_pool
+
+
+def read_captcha_bytes(img_bytes, variants=CAPTCHA_VARIANTS):
+    """
+    Read a captcha given as raw image bytes with every preprocessing variant
+    in parallel and return the best scoring reading.
+
+    Returns:
+    dict: text, confidence, score (see score_candidate, raised when several
+    variants agree) and variant of the best reading; score is 0 if no
+    variant read anything
+    """
+    pool = get_ensemble_pool()
+    futures = [pool.submit(_recognize_variant, img_bytes, variant) for variant in variants]
+    candidates = []
+    for future in futures:
+        try:
+            candidates.append(future.result())
+        except Exception as e:
+            print(f"Captcha variant failed: {str(e)}")
+    if not candidates:
+        return {"text": "", "confidence": 0.0, "score": 0.0, "variant": None}
+    # Every other variant reading the same text adds 10% to its score
+    votes = {}
+    for candidate in candidates:
+        votes[candidate["text"]] = votes.get(candidate["text"], 0) + 1
+    for candidate in candidates:
+        candidate["score"] = min(100.0, candidate["score"] * (1 + 0.1 * (votes[candidate["text"]] - 1)))
+    return max(candidates, key=lambda candidate: (candidate["score"], candidate["confidence"]))
+
+
+def read_captcha(data_url, variants=CAPTCHA_VARIANTS):
+    """
+    Read a captcha given as a data URL or base64 string, see read_captcha_bytes.
+    """
+    return read_captcha_bytes(decode_data_url(data_url), variants)
@@ -0,0 +1,188 @@
+"""
+Field maps for the case detail page and a batched extraction engine.
+
+The field maps are compiled once into a single JavaScript snippet, so every
+field of a case comes back from one execute_script round trip instead of one
+find_element call per field. extract_case_fields_from_html applies the same
+field maps to raw case detail HTML without a browser.
+"""
+import json
+import re
+
+from lxml import etree, html as lxml_html
+
+PENDING_FIELDS = {
+    "Case Type": '//*[@id="CSact"]/table[1]/tbody/tr[1]/td[2]',
+    "Filing Number": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[2]',
+    "Filing Date": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[4]',
+    "Registration Number": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[2]/label',
+    "Registration Date": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[4]',
+    "CNR Number": '//*[@id="CSact"]/table[1]/tbody/tr[4]/td[2]/span',
+    "First Hearing Date": '//*[@id="CSact"]/table[2]/tbody/tr[1]/td[2]',
+    "Next Hearing Date": '//*[@id="CSact"]/table[2]/tbody/tr[2]/td[2]/strong',
+    "Case Stage": '//*[@id="CSact"]/table[2]/tbody/tr[3]/td[2]/label/strong',
+    "Court Number and Judge": '//*[@id="CSact"]/table[2]/tbody/tr[4]/td[2]/label/strong',
+    "Petitioner and Advocate": '//*[@id="CSact"]/table[3]/tbody/tr/td',
+    "Respondent and Advocate": '//*[@id="CSact"]/table[4]/tbody/tr/td',
+    "Police Station": '//*[@id="CSact"]/table[7]/tbody/tr[1]/td[2]',
+    "FIR Number": '//*[@id="CSact"]/table[7]/tbody/tr[2]/td[2]',
+    "Year": '//*[@id="CSact"]/table[7]/tbody/tr[3]/td[2]',
+    "Case Transfer Date": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[2]',
+    "From Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[3]',
+    "To Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[4]'
+}
+
+DISPOSED_FIELDS = {
+    "Case Type": '//*[@id="CSact"]/table[1]/tbody/tr[1]/td[2]',
+    "Filing Number": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[2]',
+    "Filing Date": '//*[@id="CSact"]/table[1]/tbody/tr[2]/td[4]',
+    "Registration Number": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[2]/label',
+    "Registration Date": '//*[@id="CSact"]/table[1]/tbody/tr[3]/td[4]',
+    "CNR Number": '//*[@id="CSact"]/table[1]/tbody/tr[4]/td[2]/span',
+    "First Hearing Date": '//*[@id="CSact"]/table[2]/tbody/tr[1]/td[2]',
+    "Decision Date": '//*[@id="CSact"]/table[2]/tbody/tr[2]/td[2]/strong',
+    "Case Status": '//*[@id="CSact"]/table[2]/tbody/tr[3]/td[2]/strong',
+    "Nature of Disposal": '//*[@id="CSact"]/table[2]/tbody/tr[4]/td[2]/label/strong',
+    "Court Number and Judge": '//*[@id="CSact"]/table[2]/tbody/tr[5]/td[2]/label/strong',
+    "Petitioner and Advocate": '//*[@id="CSact"]/table[3]/tbody/tr/td',
+    "Respondent and Advocate": '//*[@id="CSact"]/table[4]/tbody/tr/td',
+    "Police Station": '//*[@id="CSact"]/table[7]/tbody/tr[1]/td[2]',
+    "FIR Number": '//*[@id="CSact"]/table[7]/tbody/tr[2]/td[2]',
+    "Year": '//*[@id="CSact"]/table[7]/tbody/tr[3]/td[2]',
+    "Case Transfer Date": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[2]',
+    "From Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[3]',
+    "To Court Number and Judge": '//*[@id="CSact"]/table[10]/tbody/tr[2]/td[4]'
+}
+
+FIELD_MAPS = {
+    "pending": PENDING_FIELDS,
+    "disposed": DISPOSED_FIELDS,
+}
+
+# Every field of either map, in page order, for output files with a fixed schema
+ALL_FIELDS = list(dict.fromkeys(list(PENDING_FIELDS) + list(DISPOSED_FIELDS)))
+
+# Evaluates every XPath in one pass and returns a JSON object of field -> text.
+# A field whose XPath matches nothing, or does not compile, comes back as null.
+_EXTRACT_TEMPLATE = """
+var fields = %s;
+var out = {};
+for (var i = 0; i < fields.length; i++) {
+    var name = fields[i][0];
+    try {
+        var node = document.evaluate(fields[i][1], document, null,
+                                     XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        out[name] = node ? node.innerText : null;
+    } catch (e) {
+        out[name] = null;
+    }
+}
+return JSON.stringify(out);
+"""
+
+
+def compile_fields(fields):
+    """
+    Compile a field map into the JavaScript snippet that extracts all of its fields.
+
+    Parameters:
+    fields (dict): Mapping of field name to XPath
+
+    Returns:
+    str: Script for driver.execute_script returning the fields as a JSON string
+    """
+    return _EXTRACT_TEMPLATE % json.dumps(list(fields.items()))
+
+
+COMPILED_FIELD_MAPS = {status: compile_fields(fields) for status, fields in FIELD_MAPS.items()}
+
+
+def extract_case_fields(driver, case_status):
+    """
+    Extract every field of the case detail page in a single WebDriver round trip.
+
+    Parameters:
+    driver (selenium.webdriver.Chrome): Driver showing the case detail page
+    case_status (str): "pending" or "disposed", selects the field map
+
+    Returns:
+    dict: Field name to stripped text, "N/A" for fields that were not found
+    """
+    if case_status not in FIELD_MAPS:
+        raise ValueError(f"Not valid Case Status: {case_status}")
+
+    values = json.loads(driver.execute_script(COMPILED_FIELD_MAPS[case_status]))
+    case_details = {}
+    for field in FIELD_MAPS[case_status]:
+        value = values.get(field)
+        case_details[field] = value.strip() if value is not None else "N/A"
+    return case_details
+
+
+def _normalise_tables(root):
+    """
+    Wrap rows that sit directly under a table in a tbody, as browsers do,
+    so the field XPaths written against the live DOM match parsed HTML.
+    """
+    for table in root.iter("table"):
+        rows = [child for child in table if child.tag == "tr"]
+        if not rows:
+            continue
+        tbody = etree.Element("tbody")
+        table.insert(table.index(rows[0]), tbody)
+        for row in rows:
+            tbody.append(row)
+
+
+def _element_text(element):
+    """
+    Approximate the rendered text of an element: <br> becomes a line break,
+    runs of whitespace collapse and blank lines are dropped.
+    """
+    for br in element.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+    text = element.text_content().replace("\xa0", " ")
+    lines = (re.sub(r"[ \t\r\f\v]+", " ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def parse_case_detail(page_html):
+    """
+    Parse case detail HTML into an lxml tree rooted at a document.
+
+    page_html may be a whole page or the fragment the site loads into the
+    "CSact" container; a fragment is wrapped in one.
+    """
+    if 'id="CSact"' not in page_html and "id='CSact'" not in page_html:
+        page_html = f'<div id="CSact">{page_html}</div>'
+    root = lxml_html.document_fromstring(page_html)
+    _normalise_tables(root)
+    return root
+
+
+def extract_case_fields_from_html(page_html, case_status, fields=None):
+    """
+    Extract the case detail fields from HTML with the same field maps.
+
+    Parameters:
+    page_html (str): Case detail page or "CSact" fragment
+    case_status (str): "pending" or "disposed", selects the field map
+    fields (dict): Field map to use instead of the one for case_status
+
+    Returns:
+    dict: Field name to text, "N/A" for fields that were not found
+    """
+    if fields is None:
+        if case_status not in FIELD_MAPS:
+            raise ValueError(f"Not valid Case Status: {case_status}")
+        fields = FIELD_MAPS[case_status]
+
+    root = parse_case_detail(page_html)
+    case_details = {}
+    for field, xpath in fields.items():
+        try:
+            nodes = root.xpath(xpath)
+        except etree.XPathError:
+            nodes = []
+        case_details[field] = _element_text(nodes[0]) if nodes else "N/A"
+    return case_details
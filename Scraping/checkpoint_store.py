@@ -0,0 +1,198 @@
+"""
+SQLite checkpoint store keyed by CNR Number.
+
+Records which cases have been scraped and how far each court search got,
+so an interrupted crawl resumes where it stopped and a rerun skips known
+cases before clicking "View". Every process opens its own connection; the
+database runs in WAL mode so pool workers can write concurrently.
+"""
+import json
+import re
+import sqlite3
+import time
+
+CNR_PATTERN = re.compile(r"\b[A-Z]{4}\d{12}\b")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    cnr TEXT PRIMARY KEY,
+    case_status TEXT NOT NULL,
+    court_key TEXT NOT NULL,
+    case_number TEXT,
+    onclick TEXT,
+    data TEXT NOT NULL,
+    scraped_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cases_court ON cases (court_key, case_status);
+CREATE TABLE IF NOT EXISTS court_progress (
+    court_key TEXT NOT NULL,
+    act TEXT NOT NULL,
+    section TEXT NOT NULL,
+    case_status TEXT NOT NULL,
+    state TEXT NOT NULL,
+    cases_scraped INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (court_key, act, section, case_status)
+);
+"""
+
+
+def find_cnr(text):
+    """
+    Return the first CNR Number (4 letters and 12 digits) in text, or None.
+    """
+    match = CNR_PATTERN.search(text or "")
+    return match.group(0) if match else None
+
+
+def court_key(state_code, dist_code, court_complex_code, est_code):
+    """
+    Key identifying one court establishment in the store.
+    """
+    return "|".join((str(state_code), str(dist_code), str(court_complex_code), str(est_code)))
+
+
+class CheckpointStore:
+    """
+    Persistent record of scraped cases and per-court progress.
+
+    Parameters:
+    path (str): SQLite database file, created if missing
+    """
+
+    def __init__(self, path="checkpoint.sqlite3"):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has_case(self, cnr):
+        """
+        True if the case with this CNR Number has already been scraped.
+        """
+        row = self.conn.execute("SELECT 1 FROM cases WHERE cnr = ?", (cnr,)).fetchone()
+        return row is not None
+
+    def known_cnrs(self, court=None, case_status=None):
+        """
+        CNR Numbers already scraped, optionally only for one court and case status.
+
+        Returns:
+        set: The CNR Numbers
+        """
+        query = "SELECT cnr FROM cases WHERE 1 = 1"
+        params = []
+        if court is not None:
+            query += " AND court_key = ?"
+            params.append(court)
+        if case_status is not None:
+            query += " AND case_status = ?"
+            params.append(case_status)
+        return {row[0] for row in self.conn.execute(query, params)}
+
+    def iter_cases(self, court=None, case_status=None):
+        """
+        Stored cases with their metadata, optionally only for one court and case status.
+
+        Yields:
+        dict: cnr, case_status, court_key, case_number, onclick, data (the
+        case detail dict) and scraped_at
+        """
+        query = "SELECT cnr, case_status, court_key, case_number, onclick, data, scraped_at FROM cases WHERE 1 = 1"
+        params = []
+        if court is not None:
+            query += " AND court_key = ?"
+            params.append(court)
+        if case_status is not None:
+            query += " AND case_status = ?"
+            params.append(case_status)
+        for cnr, status, key, case_number, onclick, data, scraped_at in self.conn.execute(query, params).fetchall():
+            yield {"cnr": cnr, "case_status": status, "court_key": key, "case_number": case_number,
+                   "onclick": onclick, "data": json.loads(data), "scraped_at": scraped_at}
+
+    def court_searches(self, court, case_status=None):
+        """
+        The (act, section) searches recorded for a court, optionally for one case status.
+
+        Returns:
+        list: (act, section) pairs
+        """
+        query = "SELECT DISTINCT act, section FROM court_progress WHERE court_key = ?"
+        params = [court]
+        if case_status is not None:
+            query += " AND case_status = ?"
+            params.append(case_status)
+        return [tuple(row) for row in self.conn.execute(query, params)]
+
+    def save_case(self, cnr, case_details, case_status, court, case_number=None, onclick=None,
+                  act=None, section=None):
+        """
+        Record a scraped case, replacing any earlier copy of it, and count it
+        for the running search of this court, status, act and section, if
+        act and section are given.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cases (cnr, case_status, court_key, case_number, onclick, data, scraped_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (cnr, case_status, court, case_number, onclick,
+             json.dumps(case_details, ensure_ascii=False), time.time()),
+        )
+        if act is not None and section is not None:
+            self.conn.execute(
+                "UPDATE court_progress SET cases_scraped = cases_scraped + 1, updated_at = ? "
+                "WHERE court_key = ? AND act = ? AND section = ? AND case_status = ? AND state = 'running'",
+                (time.time(), court, act, section, case_status),
+            )
+        self.conn.commit()
+
+    def get_case(self, cnr):
+        """
+        Return the stored case detail dict for a CNR Number, or None.
+        """
+        row = self.conn.execute("SELECT data FROM cases WHERE cnr = ?", (cnr,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def start_court(self, court, act, section, case_status):
+        """
+        Mark a court search as running, keeping the count of an interrupted run.
+        """
+        self.conn.execute(
+            "INSERT INTO court_progress (court_key, act, section, case_status, state, updated_at) "
+            "VALUES (?, ?, ?, ?, 'running', ?) "
+            "ON CONFLICT (court_key, act, section, case_status) DO UPDATE SET state = 'running', "
+            "updated_at = excluded.updated_at",
+            (court, act, section, case_status, time.time()),
+        )
+        self.conn.commit()
+
+    def finish_court(self, court, act, section, case_status):
+        """
+        Mark a court search as done, so resumed crawls skip it.
+        """
+        self.conn.execute(
+            "UPDATE court_progress SET state = 'done', updated_at = ? "
+            "WHERE court_key = ? AND act = ? AND section = ? AND case_status = ?",
+            (time.time(), court, act, section, case_status),
+        )
+        self.conn.commit()
+
+    def is_court_done(self, court, act, section, case_status):
+        """
+        True if this court search finished in an earlier run.
+        """
+        row = self.conn.execute(
+            "SELECT state FROM court_progress WHERE court_key = ? AND act = ? AND section = ? AND case_status = ?",
+            (court, act, section, case_status),
+        ).fetchone()
+        return row is not None and row[0] == "done"
@@ -0,0 +1,280 @@
+"""
+Cached court hierarchy index: state -> district -> court complex -> establishment.
+
+Walking the dropdowns once builds the whole hierarchy, which is saved as a
+JSON file with the time it was built. Jobs then look courts up by name or
+code from the file instead of enumerating the dropdowns every run; the index
+is rebuilt only when it is older than its TTL.
+
+An index built for some states only records which ones it holds. Asking it
+for another state crawls that state and merges it in, and asking for all
+states rebuilds it, instead of silently finding no courts. Building with
+--state likewise recrawls that state into the saved index.
+
+Usage:
+    python court_index.py build [--state 18] [--index court_index.json]
+    python court_index.py find --state Maharashtra --district Aurangabad
+"""
+import argparse
+import json
+import os
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import Get_court_data as court_data
+
+INDEX_FILE = "court_index.json"
+DEFAULT_TTL_DAYS = 30
+
+# Reads [value, text] of every real option of a select in one round trip
+READ_OPTIONS_JS = """
+var select = document.getElementById(arguments[0]);
+if (!select) { return []; }
+return Array.from(select.options)
+    .filter(function (o) { return o.value && o.value !== "0"; })
+    .map(function (o) { return [o.value, o.text.trim()]; });
+"""
+
+# Sets a select's value and fires change, which triggers the site's AJAX reload
+SELECT_VALUE_JS = """
+var select = document.getElementById(arguments[0]);
+select.value = arguments[1];
+select.dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+
+def read_options(select_id):
+    return court_data.driver.execute_script(READ_OPTIONS_JS, select_id)
+
+
+def select_and_read(select_id, value, child_id):
+    """
+    Select a value in one dropdown and read the options it loads into the next
+    once the site's AJAX reload is over, so an empty child list or one equal
+    to the previous parent's is read as soon as it arrives.
+
+    Returns:
+    list: [value, text] pairs of the child dropdown, empty if none loaded
+    """
+    court_data.driver.execute_script(SELECT_VALUE_JS, select_id, value)
+    try:
+        court_data.waiter.ajax_idle()
+    except TimeoutException:
+        print(f"Options of {child_id} for {value} still loading, reading what is there")
+    return read_options(child_id)
+
+
+def crawl_hierarchy(state_codes=None):
+    """
+    Walk the case status dropdowns and collect the whole court hierarchy.
+
+    Parameters:
+    state_codes (list): Only crawl these states, all states by default
+
+    Returns:
+    list: Nested state dicts with code, name and districts, each district
+    with complexes and each complex with establishments
+    """
+    driver = court_data.driver
+    driver.get(court_data.SITE_URL)
+    WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.ID, "leftPaneMenuCS"))).click()
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "sess_state_code")))
+
+    states = []
+    for state_code, state_name in read_options("sess_state_code"):
+        if state_codes and state_code not in state_codes:
+            continue
+        print(f"Indexing state {state_name}")
+        districts = []
+        for dist_code, dist_name in select_and_read("sess_state_code", state_code, "sess_dist_code"):
+            complexes = []
+            for complex_code, complex_name in select_and_read("sess_dist_code", dist_code, "court_complex_code"):
+                establishments = select_and_read("court_complex_code", complex_code, "court_est_code")
+                complexes.append({
+                    "code": complex_code,
+                    "name": complex_name,
+                    "establishments": [{"code": code, "name": name} for code, name in establishments],
+                })
+            districts.append({"code": dist_code, "name": dist_name, "complexes": complexes})
+        states.append({"code": state_code, "name": state_name, "districts": districts})
+    return states
+
+
+def save_index(states, filename=INDEX_FILE, complete=True, built_at=None):
+    """
+    Save the nested states, recording whether they are all states of the site.
+    """
+    index = {"built_at": built_at or time.time(), "complete": complete, "states": states}
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump(index, file, ensure_ascii=False, indent=1)
+    print(f"Court index saved to {filename}")
+
+
+def read_index(filename=INDEX_FILE, ttl_days=DEFAULT_TTL_DAYS):
+    """
+    Read a saved index file if it exists and is younger than ttl_days.
+
+    Returns:
+    dict: built_at, complete and states, or None if the index is missing or stale
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename, encoding="utf-8") as file:
+        index = json.load(file)
+    if ttl_days is not None and time.time() - index.get("built_at", 0) > ttl_days * 86400:
+        print(f"Court index {filename} is older than {ttl_days} days")
+        return None
+    index.setdefault("complete", True)
+    return index
+
+
+def missing_states(index, state_codes=None):
+    """
+    The requested state codes a saved index does not hold.
+
+    Returns:
+    list: The missing codes, or None if all states were asked for and the
+    index only holds some of them
+    """
+    if state_codes is None:
+        return [] if index["complete"] else None
+    indexed = {state["code"] for state in index["states"]}
+    return [code for code in state_codes if code not in indexed]
+
+
+def merge_index(states, filename=INDEX_FILE, ttl_days=DEFAULT_TTL_DAYS):
+    """
+    Save freshly crawled states into the saved index, replacing its copy of
+    those states and keeping the others, or as a new partial index when
+    there is no fresh one.
+
+    Returns:
+    list: All states of the saved index
+    """
+    index = read_index(filename, ttl_days)
+    if index is None:
+        save_index(states, filename, complete=False)
+        return states
+    crawled = {state["code"] for state in states}
+    merged = [state for state in index["states"] if state["code"] not in crawled] + states
+    # Keep the older build time, so the index expires with its oldest states
+    save_index(merged, filename, index["complete"], index["built_at"])
+    return merged
+
+
+def load_index(filename=INDEX_FILE, ttl_days=DEFAULT_TTL_DAYS, state_codes=None):
+    """
+    Load a saved index if it exists, is younger than ttl_days and holds the
+    requested states (all states by default).
+
+    Returns:
+    list: The nested states, or None if the index is missing, stale or partial
+    """
+    index = read_index(filename, ttl_days)
+    if index is None or missing_states(index, state_codes) != []:
+        return None
+    return index["states"]
+
+
+def get_index(filename=INDEX_FILE, ttl_days=DEFAULT_TTL_DAYS, state_codes=None):
+    """
+    Return the court index, crawling and saving it first if missing or stale.
+
+    If the saved index lacks requested states, only those are crawled and
+    merged into it; if all states are asked for and it holds only some, it
+    is rebuilt.
+    """
+    index = read_index(filename, ttl_days)
+    missing = missing_states(index, state_codes) if index is not None else None
+    if missing == []:
+        return index["states"]
+
+    court_data.get_driver()
+    if index is not None and missing:
+        print(f"Court index {filename} lacks states {', '.join(missing)}, adding them")
+        states = merge_index(crawl_hierarchy(missing), filename, ttl_days)
+    else:
+        states = crawl_hierarchy(state_codes)
+        save_index(states, filename, complete=state_codes is None)
+    return states
+
+
+def _matches(entry, query):
+    if query is None:
+        return True
+    query = str(query).strip().lower()
+    return entry["code"].lower() == query or query in entry["name"].lower()
+
+
+def find_courts(states, state=None, district=None, court_complex=None, establishment=None):
+    """
+    Look up courts in the index by code or by (partial, case-insensitive) name.
+
+    Each level left as None matches everything. A complex without an
+    establishment dropdown yields one court with est_code "".
+
+    Returns:
+    list: Flat court dicts with the codes and names of every level, usable
+    as crawl_pool units
+    """
+    courts = []
+    for state_entry in states:
+        if not _matches(state_entry, state):
+            continue
+        for dist_entry in state_entry["districts"]:
+            if not _matches(dist_entry, district):
+                continue
+            for complex_entry in dist_entry["complexes"]:
+                if not _matches(complex_entry, court_complex):
+                    continue
+                establishments = complex_entry["establishments"] or [{"code": "", "name": ""}]
+                for est_entry in establishments:
+                    if complex_entry["establishments"] and not _matches(est_entry, establishment):
+                        continue
+                    courts.append({
+                        "state_code": state_entry["code"],
+                        "state_name": state_entry["name"],
+                        "dist_code": dist_entry["code"],
+                        "dist_name": dist_entry["name"],
+                        "court_complex_code": complex_entry["code"],
+                        "court_complex_name": complex_entry["name"],
+                        "est_code": est_entry["code"],
+                        "est_name": est_entry["name"],
+                    })
+    return courts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or query the cached court hierarchy index.")
+    parser.add_argument("command", choices=("build", "find"))
+    parser.add_argument("--index", default=INDEX_FILE, help="Index file")
+    parser.add_argument("--ttl-days", type=float, default=DEFAULT_TTL_DAYS, help="Rebuild when older than this")
+    parser.add_argument("--state", help="State code or name")
+    parser.add_argument("--district", help="District code or name")
+    parser.add_argument("--complex", help="Court complex code or name")
+    parser.add_argument("--establishment", help="Establishment code or name")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        court_data.start_driver()
+        try:
+            if args.state:
+                merge_index(crawl_hierarchy([args.state]), args.index, args.ttl_days)
+            else:
+                save_index(crawl_hierarchy(), args.index)
+        finally:
+            court_data.driver.quit()
+    else:
+        index = read_index(args.index, args.ttl_days)
+        if index is None:
+            raise SystemExit(f"No fresh court index at {args.index}, run: python court_index.py build")
+        if not index["complete"]:
+            print(f"Index holds only states {', '.join(state['code'] for state in index['states'])}")
+        for court in find_courts(index["states"], args.state, args.district, args.complex, args.establishment):
+            print(f"{court['state_code']},{court['dist_code']},{court['court_complex_code']},{court['est_code']}"
+                  f"  {court['state_name']} / {court['dist_name']} / {court['court_complex_name']}"
+                  f" / {court['est_name']}")
@@ -0,0 +1,336 @@
+"""
+Worker-pool mode for crawling many courts in parallel.
+
+Each worker process owns its own Chrome session. The scheduler puts one
+(state, district, court complex, establishment, case status) unit per court
+and status on the pool's task queue, idle workers pull the next unit, and
+every case is sent back to the parent as soon as it is scraped and written
+into one output file. All workers share one adaptive limiter of the site
+(rate_limiter.start_shared_limiter), so the searches and case detail
+requests in flight across the pool shrink when the site struggles, however
+many workers there are.
+
+Usage:
+    python crawl_pool.py courts.csv --act "Indian Penal Code" --section 376 --workers 4
+
+courts.csv has the columns state_code, dist_code, court_complex_code, est_code.
+Instead of a file, courts can be picked from the cached court index by code
+or name, e.g. --state Maharashtra --district Aurangabad.
+
+With --attach, workers drive warm browsers started by browser_session
+instead of launching their own.
+
+With --checkpoint, finished units and already scraped cases are recorded in
+a CheckpointStore, so rerunning the same command resumes the crawl and
+appends only new cases to the output. The parent records a case only after
+writing it, and a unit only after its last case.
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import queue
+from multiprocessing.util import Finalize
+
+import Get_court_data as court_data
+from case_fields import ALL_FIELDS
+from checkpoint_store import CheckpointStore, court_key
+from court_index import INDEX_FILE, find_courts, get_index
+from output_sinks import open_sink
+from page_archive import PageArchive
+from rate_limiter import start_shared_limiter
+from search_results import add_filter_arguments, make_row_filter
+from tracing import tracer
+
+CASE_STATUSES = ("pending", "disposed")
+
+LABEL_FIELDS = ["State Code", "District Code", "Court Complex Code", "Establishment Code", "Case Status Searched"]
+
+# Checkpoint store, page archive and results queue of this worker process, None when not used
+store = None
+archive = None
+results = None
+
+
+class UnitOutput:
+    """
+    Sink and store of process_search_results in a worker.
+
+    Cases are sent to the parent on the results queue, labelled with their
+    unit. Records for the checkpoint store are sent on the same queue behind
+    them, and the parent applies them only after writing the cases, so the
+    store never holds a case the output is missing. Already scraped cases
+    are looked up in the worker's own connection to the store.
+
+    Parameters:
+    results (multiprocessing.Queue): Queue the parent reads
+    labels (dict): Label fields added to every case
+    store (CheckpointStore): This worker's store, None when not checkpointing
+    """
+
+    def __init__(self, results, labels, store=None):
+        self.results = results
+        self.labels = labels
+        self.store = store
+        self.count = 0
+
+    def has_case(self, cnr):
+        return self.store is not None and self.store.has_case(cnr)
+
+    def write(self, case):
+        self.results.put(("case", {**self.labels, **case}))
+        self.count += 1
+
+    def save_case(self, *args):
+        if self.store is not None:
+            self.results.put(("save", args))
+
+    def finish_court(self, *args):
+        if self.store is not None:
+            self.results.put(("finish", args))
+
+
+def load_courts(filename):
+    """
+    Read the courts to crawl from a CSV file.
+
+    Returns:
+    list: One dict per court with state_code, dist_code, court_complex_code and est_code
+    """
+    with open(filename, newline='', encoding='utf-8') as file:
+        return [
+            {
+                "state_code": row["state_code"].strip(),
+                "dist_code": row["dist_code"].strip(),
+                "court_complex_code": row["court_complex_code"].strip(),
+                "est_code": row["est_code"].strip(),
+            }
+            for row in csv.DictReader(file)
+        ]
+
+
+def build_units(courts, case_statuses=CASE_STATUSES):
+    """
+    Expand courts into work units, one per court and case status.
+    """
+    return [
+        (court["state_code"], court["dist_code"], court["court_complex_code"], court["est_code"], case_status)
+        for court in courts
+        for case_status in case_statuses
+    ]
+
+
+def init_worker(checkpoint=None, archive_dir=None, browser_options=None, attach_addresses=None,
+                result_queue=None, limiter=None):
+    """
+    Pool initializer: set up the Chrome session owned by this worker process
+    and open its connection to the checkpoint store and page archive.
+    Cases go to the parent on result_queue, and requests to the site wait
+    for a slot of limiter, the pool's SharedLimiter.
+
+    browser_options are keyword arguments for Get_court_data.start_driver,
+    e.g. the lean profile and recycling limits. attach_addresses is a queue
+    of warm browsers' debugger addresses; each worker takes one while any
+    are left and launches its own browser otherwise.
+
+    The browser itself is started by the first crawl_unit: an initializer
+    that raises makes the pool respawn the worker forever, while a unit
+    that fails is reported and left unfinished.
+    """
+    global store, archive, results
+    results = result_queue
+    browser_options = dict(browser_options or {})
+    if attach_addresses is not None:
+        try:
+            browser_options["debugger_address"] = attach_addresses.get_nowait()
+        except queue.Empty:
+            pass
+    if limiter is not None:
+        court_data.use_limiter(limiter)
+    # Settings for get_driver, which starts the browser on first use
+    court_data.driver_settings.update(browser_options)
+    # Quit the browser, recycled or not, when the worker exits after pool.close()/join()
+    Finalize(None, court_data.quit_driver, exitpriority=10)
+    if checkpoint:
+        store = CheckpointStore(checkpoint)
+        Finalize(store, store.close, exitpriority=5)
+    if archive_dir:
+        archive = PageArchive(archive_dir)
+
+
+def crawl_unit(unit, act_name, section_number, filter_options=None, prefetch=0):
+    """
+    Search one court for one case status in this worker's browser.
+
+    filter_options are keyword arguments for search_results.make_row_filter;
+    they are passed instead of the filter itself so they can be pickled.
+    prefetch is the in-page detail fetch concurrency, 0 to click "View".
+
+    Every case is sent to the parent on the results queue as soon as it is
+    scraped, labelled with the court and case status, see UnitOutput. A
+    unit whose search or result table failed is left unfinished in the
+    checkpoint store, so a resumed crawl tries it again.
+
+    Returns:
+    tuple: Number of cases sent, and the timing spans this worker recorded
+    for the unit
+    """
+    state_code, dist_code, court_complex_code, est_code, case_status = unit
+    court = court_key(state_code, dist_code, court_complex_code, est_code)
+    output = UnitOutput(results, dict(zip(LABEL_FIELDS, unit)), store)
+    try:
+        court_data.get_driver()
+        if store is not None:
+            store.start_court(court, act_name, section_number, case_status)
+        if not court_data.access_court_services(act_name, section_number, state_code, dist_code,
+                                                court_complex_code, est_code, case_status):
+            raise court_data.SearchFailed("Search did not bring up results")
+        court_data.process_search_results(case_status, sink=output, store=output, court=court,
+                                          row_filter=make_row_filter(**(filter_options or {})),
+                                          archive=archive, prefetch=prefetch,
+                                          act_name=act_name, section_number=section_number)
+        output.finish_court(court, act_name, section_number, case_status)
+    except Exception as e:
+        print(f"Error crawling unit {unit}: {str(e)}")
+    return output.count, tracer.drain()
+
+
+def pending_units(units, checkpoint, act_name, section_number):
+    """
+    Drop the units an earlier run already finished.
+    """
+    with CheckpointStore(checkpoint) as done_store:
+        return [unit for unit in units
+                if not done_store.is_court_done(court_key(*unit[:4]), act_name, section_number, unit[4])]
+
+
+def run_pool(units, sink, act_name="Indian Penal Code", section_number="376", workers=2, checkpoint=None,
+             filter_options=None, archive_dir=None, browser_options=None, attach=None, prefetch=0):
+    """
+    Crawl all units on a pool of browser workers and merge their results into one sink.
+
+    Units are handed out one at a time, so a slow court only holds up the
+    worker that drew it. Cases are written as the workers scrape them, and
+    the workers' timing spans are merged into this process's tracer. The
+    workers' requests to the site share one adaptive limiter.
+    With a checkpoint file, units finished by an earlier run are skipped, and
+    cases and finished units are recorded here once their cases are written.
+    With an archive directory, every raw case detail page is archived.
+    browser_options are passed to each worker's start_driver, and attach
+    lists debugger addresses of warm browsers for the workers to use.
+
+    Returns:
+    int: Number of cases written
+    """
+    if checkpoint:
+        skipped = len(units)
+        units = pending_units(units, checkpoint, act_name, section_number)
+        print(f"Resuming: {skipped - len(units)} units already done, {len(units)} to crawl")
+    written = 0
+    attach_addresses = None
+    if attach:
+        attach_addresses = multiprocessing.Queue()
+        for address in attach:
+            attach_addresses.put(address)
+    result_queue = multiprocessing.Queue()
+    manager, limiter = start_shared_limiter()
+    done_store = CheckpointStore(checkpoint) if checkpoint else None
+    pool = multiprocessing.Pool(processes=workers, initializer=init_worker,
+                                initargs=(checkpoint, archive_dir, browser_options, attach_addresses, result_queue,
+                                          limiter))
+    try:
+        tasks = [(unit, act_name, section_number, filter_options, prefetch) for unit in units]
+        outcome = pool.map_async(_crawl_unit_star, tasks, chunksize=1)
+        done = 0
+        # Each worker sends its unit's cases, then their store records, then "done"
+        while done < len(tasks):
+            try:
+                kind, payload = result_queue.get(timeout=1)
+            except queue.Empty:
+                if outcome.ready() and not outcome.successful():
+                    outcome.get()
+                continue
+            if kind == "case":
+                sink.write(payload)
+                written += 1
+            elif kind == "save":
+                done_store.save_case(*payload)
+            elif kind == "finish":
+                done_store.finish_court(*payload)
+            else:
+                tracer.extend(payload)
+                done += 1
+                print(f"Finished {done}/{len(units)} units, {written} cases so far")
+        print(f"Site limiter: window {limiter.limit()}, {limiter.stats}")
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        manager.shutdown()
+        if done_store is not None:
+            done_store.close()
+    return written
+
+
+def _crawl_unit_star(args):
+    _, spans = crawl_unit(*args)
+    results.put(("done", spans))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl many courts with a pool of browser workers.")
+    parser.add_argument("courts", nargs="?",
+                        help="CSV file with state_code, dist_code, court_complex_code, est_code")
+    parser.add_argument("--court-index", default=INDEX_FILE, help="Court index to pick courts from")
+    parser.add_argument("--state", help="State code or name in the court index")
+    parser.add_argument("--district", help="District code or name in the court index")
+    parser.add_argument("--complex", help="Court complex code or name in the court index")
+    parser.add_argument("--establishment", help="Establishment code or name in the court index")
+    parser.add_argument("--act", default="Indian Penal Code", help="Act name to search for")
+    parser.add_argument("--section", default="376", help="Section number to search for")
+    parser.add_argument("--status", choices=CASE_STATUSES, action="append",
+                        help="Case status to crawl, may be repeated (default: both)")
+    parser.add_argument("--workers", type=int, default=2, help="Number of browser workers")
+    parser.add_argument("--output", default="case_details.csv",
+                        help="Merged output file, .csv, .jsonl or .parquet")
+    parser.add_argument("--checkpoint", default=None,
+                        help="SQLite checkpoint file to resume from and skip already scraped cases")
+    parser.add_argument("--archive", default=None, help="Directory to archive raw case detail pages in")
+    parser.add_argument("--lean", action="store_true",
+                        help="Run headless and block images, fonts and stylesheets")
+    parser.add_argument("--recycle-after", type=int, default=None,
+                        help="Restart each worker's browser after this many cases")
+    parser.add_argument("--max-memory-mb", type=float, default=None,
+                        help="Restart a worker's browser above this memory use (needs psutil)")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="Fetch this many case details at once inside the page instead of clicking View")
+    parser.add_argument("--attach", action="append",
+                        help="Debugger address of a warm browser to use, may be repeated")
+    parser.add_argument("--trace", default=None, help="Write per-stage timing spans to this JSON trace file")
+    parser.add_argument("--metrics", default=None, help="Write a Prometheus-style timing summary to this file")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+
+    if args.courts:
+        courts = load_courts(args.courts)
+    else:
+        state_codes = [args.state] if args.state and args.state.isdigit() else None
+        courts = find_courts(get_index(args.court_index, state_codes=state_codes),
+                             args.state, args.district, args.complex, args.establishment)
+        # The index is built in this process, its browser is not needed any more
+        court_data.quit_driver()
+    units = build_units(courts, args.status or CASE_STATUSES)
+    append = bool(args.checkpoint) and os.path.exists(args.output)
+    with open_sink(args.output, LABEL_FIELDS + ALL_FIELDS, append=append) as sink:
+        run_pool(units, sink, args.act, args.section, args.workers, args.checkpoint,
+                 {"year_from": args.year_from, "year_to": args.year_to,
+                  "case_types": args.case_type, "number_pattern": args.number_pattern},
+                 args.archive,
+                 {"lean": args.lean, "recycle_after": args.recycle_after, "max_memory_mb": args.max_memory_mb},
+                 args.attach, args.prefetch)
+    if args.trace:
+        tracer.export_trace(args.trace)
+    if args.metrics:
+        tracer.export_metrics(args.metrics)
@@ -0,0 +1,104 @@
+"""
+Concurrent case detail prefetch inside the browser session.
+
+Instead of clicking "View", waiting, scraping and going back for each row,
+the arguments of every row's viewHistory(...) call are posted by the page
+itself with fetch(), a bounded number at a time, from one
+execute_async_script call. The requests carry the session's cookies and
+app_token like the page's own AJAX calls, and the returned "CSact"
+fragments go straight to case_fields.extract_case_fields_from_html.
+
+The site hands out a new app_token with every response. Requests in flight
+share the latest token seen; if the site rejects reused tokens, use a
+concurrency of 1, which still saves the back navigation.
+"""
+from http_backend import VIEW_HISTORY_ARGS, VIEW_HISTORY_PATH
+
+PREFETCH_BATCH_SIZE = 20
+
+# arguments: request dicts, endpoint path, concurrency limit, per-request timeout in ms, callback
+PREFETCH_JS = """
+var requests = arguments[0], path = arguments[1], limit = arguments[2], timeoutMs = arguments[3];
+var done = arguments[arguments.length - 1];
+var tokenInput = document.querySelector('input[name="app_token"]');
+var token = tokenInput ? tokenInput.value : '';
+var url = new URL(path, document.baseURI).href;
+var results = new Array(requests.length), next = 0, active = 0, finished = 0;
+
+function finish() {
+    // Leave the latest token for the page's own requests
+    if (tokenInput) { tokenInput.value = token; }
+    done(results);
+}
+
+function launch() {
+    while (active < limit && next < requests.length) {
+        (function (i) {
+            active++;
+            var body = new URLSearchParams(requests[i]);
+            body.set('ajax_req', 'true');
+            body.set('app_token', token);
+            // A hung request comes back as an error instead of stalling the batch
+            var controller = new AbortController();
+            var timer = setTimeout(function () { controller.abort(); }, timeoutMs);
+            fetch(url, {method: 'POST', credentials: 'same-origin', signal: controller.signal,
+                        headers: {'X-Requested-With': 'XMLHttpRequest'}, body: body})
+                .then(function (response) {
+                    if (!response.ok) { throw new Error('HTTP ' + response.status); }
+                    return response.json();
+                })
+                .then(function (json) {
+                    if (json.app_token) { token = json.app_token; }
+                    results[i] = json.data_list ? {html: json.data_list} : {error: json.errormsg || 'empty response'};
+                })
+                .catch(function (e) {
+                    results[i] = {error: e.name === 'AbortError' ? 'timed out after ' + timeoutMs + ' ms' : String(e)};
+                })
+                .then(function () {
+                    clearTimeout(timer);
+                    active--;
+                    finished++;
+                    if (finished === requests.length) { finish(); } else { launch(); }
+                });
+        })(next++);
+    }
+}
+
+if (requests.length) { launch(); } else { finish(); }
+"""
+
+
+def view_request(row):
+    """
+    The viewHistory form fields of a result row.
+    """
+    return dict(zip(VIEW_HISTORY_ARGS, row["view_args"]))
+
+
+def prefetch_details(driver, rows, concurrency=4, request_timeout=15):
+    """
+    Fetch the case detail fragments of result rows from inside the page.
+
+    Parameters:
+    driver: The Selenium WebDriver, on the search results page
+    rows (list): Row dicts from search_results.read_result_rows, best kept
+    to a batch of about PREFETCH_BATCH_SIZE so results can be stored early
+    concurrency (int): Requests in flight at once
+    request_timeout (float): Seconds allowed per request; a request taking
+    longer is aborted and returned as an error
+
+    Returns:
+    list: (row, fragment HTML or None, error message or None) per row
+    """
+    if not rows:
+        return []
+    rounds = -(-len(rows) // concurrency)
+    # Every request ends within request_timeout, so this only guards against a broken page
+    driver.set_script_timeout(max(30, rounds * request_timeout + 10))
+    results = driver.execute_async_script(PREFETCH_JS, [view_request(row) for row in rows],
+                                          VIEW_HISTORY_PATH, concurrency, int(request_timeout * 1000))
+    fetched = []
+    for row, result in zip(rows, results):
+        result = result or {"error": "no response"}
+        fetched.append((row, result.get("html"), result.get("error")))
+    return fetched
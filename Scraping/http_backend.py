@@ -0,0 +1,371 @@
+"""
+Direct-HTTP scraping backend.
+
+Sends the same AJAX requests the eCourts page makes from its own JavaScript
+(act list, act search with captcha, case history) over a pooled keep-alive
+HTTP session, and parses the returned HTML fragments without a browser. It
+yields the same case detail dicts as scrape_case_details.
+
+Usage:
+    python http_backend.py --act "Indian Penal Code" --section 376 [--base-url http://127.0.0.1:8800/ecourtindia_v6/]
+    python http_backend.py courts.csv --checkpoint checkpoint.sqlite3
+    python http_backend.py --state Maharashtra --district Aurangabad --status disposed
+
+Courts are picked like in crawl_pool, from a CSV file or the cached court
+index; without either, the default court is scraped. With --checkpoint, a
+rerun skips the courts an earlier run finished and the cases already
+scraped, and appends the new ones to the output.
+"""
+import argparse
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import html as lxml_html
+
+from captcha_solver import CAPTCHA_MIN_SCORE, read_captcha_bytes
+from case_fields import FIELD_MAPS, extract_case_fields_from_html
+from checkpoint_store import court_key, find_cnr
+from rate_limiter import limiter_for
+from search_results import add_filter_arguments, make_row_filter, parse_result_rows, row_filter_from_args
+from tracing import tracer
+
+BASE_URL = "https://services.ecourts.gov.in/ecourtindia_v6/"
+
+INDEX_PATH = "?p=casestatus/index"
+CAPTCHA_PATH = "vendor/securimage/securimage_show.php"
+ACT_LIST_PATH = "?p=casestatus/fillActType"
+SEARCH_ACT_PATH = "?p=casestatus/submitAct"
+VIEW_HISTORY_PATH = "?p=home/viewHistory"
+
+# Argument names of the viewHistory(...) call behind each "View" link
+VIEW_HISTORY_ARGS = ("case_no", "cino", "court_code", "hideparty", "search_flag",
+                     "state_code", "dist_code", "court_complex_code", "search_by")
+
+CASE_STATUS_VALUES = {"pending": "Pending", "disposed": "Disposed"}
+
+
+class CaptchaRejected(Exception):
+    """
+    Raised when the site rejects the captcha on every attempt.
+    """
+
+
+class ServerBusy(requests.HTTPError):
+    """
+    Raised for 429 and 5xx answers, which are retried after a backoff.
+    """
+
+
+class EcourtsHttpClient:
+    """
+    Keep-alive HTTP client for the eCourts case status AJAX endpoints.
+
+    Every request goes through the host's AimdLimiter (see rate_limiter),
+    which reports timeouts and server errors to it and retries them with a
+    jittered backoff.
+
+    Parameters:
+    base_url (str): Root of the eCourts application, ending with "/"
+    pool_size (int): Connections kept open per host
+    timeout (float): Seconds to wait for each response
+    limiter (AimdLimiter): Limiter to use, the host's process-wide one by default
+    max_attempts (int): Tries per request
+    """
+
+    def __init__(self, base_url=BASE_URL, pool_size=10, timeout=30, limiter=None, max_attempts=4):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limiter = limiter or limiter_for(base_url)
+        self.max_attempts = max_attempts
+        self.app_token = ""
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64)",
+            "X-Requested-With": "XMLHttpRequest",
+        })
+        # Only failed connections are retried here, everything else by the limiter
+        retry = Retry(total=2, connect=2, read=0, status=0, redirect=2, backoff_factor=0.2)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _url(self, path):
+        return self.base_url + path
+
+    def _request(self, method, path, **kwargs):
+        """
+        Send a request through the limiter, retrying timeouts, connection
+        failures and 429/5xx answers with a jittered backoff.
+        """
+        def attempt():
+            with self.limiter.slot() as slot:
+                try:
+                    response = self.session.request(method, self._url(path), timeout=self.timeout, **kwargs)
+                except requests.Timeout:
+                    slot.outcome = "timeout"
+                    raise
+                if response.status_code == 429 or response.status_code >= 500:
+                    slot.outcome = "error"
+                    raise ServerBusy(f"HTTP {response.status_code} from {path}", response=response)
+                response.raise_for_status()
+                return response
+
+        return self.limiter.retry(attempt, self.max_attempts, (requests.ConnectionError, requests.Timeout, ServerBusy))
+
+    def _post(self, path, data):
+        """
+        POST an AJAX request and return its JSON, keeping the rolling app_token.
+        """
+        payload = dict(data, ajax_req="true", app_token=self.app_token)
+        result = self._request("POST", path, data=payload).json()
+        self.app_token = result.get("app_token", self.app_token)
+        return result
+
+    def open_session(self):
+        """
+        Load the case status page to get session cookies and the first app_token.
+        """
+        response = self._request("GET", INDEX_PATH)
+        match = re.search(r'app_token.{0,80}?value="([0-9a-f]{16,})"', response.text)
+        if match:
+            self.app_token = match.group(1)
+
+    def get_captcha_image(self):
+        """
+        Fetch a fresh captcha image for this session.
+
+        Returns:
+        bytes: The image bytes
+        """
+        return self._request("GET", CAPTCHA_PATH, params={str(random.random()): ""}).content
+
+    def get_act_code(self, act_name, state_code, dist_code, court_complex_code, est_code):
+        """
+        Look up the value of an act in the act dropdown by its visible name.
+        """
+        result = self._post(ACT_LIST_PATH, {
+            "search_act": act_name,
+            "state_code": state_code,
+            "dist_code": dist_code,
+            "court_complex_code": court_complex_code,
+            "est_code": est_code,
+        })
+        root = lxml_html.fragment_fromstring(result.get("act_list", ""), create_parent="select")
+        for option in root.xpath("//option"):
+            if option.text_content().strip() == act_name:
+                return option.get("value")
+        raise ValueError(f"Act not found: {act_name}")
+
+    def search_act(self, act_code, section_number, case_status, state_code, dist_code,
+                   court_complex_code, est_code, max_attempts=3):
+        """
+        Submit the act/section search, solving the captcha in memory. A
+        captcha read with a score below CAPTCHA_MIN_SCORE is not submitted;
+        a new one is fetched instead, up to the last attempt.
+
+        Returns:
+        list: Result rows, see parse_result_rows
+        """
+        for attempt in range(max_attempts):
+            with tracer.span("captcha"):
+                reading = read_captcha_bytes(self.get_captcha_image())
+            captcha_text = reading["text"]
+            print(f"Attempt {attempt + 1} with captcha {captcha_text} (score {reading['score']:.0f})")
+            if not captcha_text:
+                continue
+            if reading["score"] < CAPTCHA_MIN_SCORE and attempt < max_attempts - 1:
+                print("Low confidence, fetching a new captcha")
+                continue
+            with tracer.span("search"):
+                result = self._post(SEARCH_ACT_PATH, {
+                    "search_act": "",
+                    "actcode": act_code,
+                    "under_sec": section_number,
+                    "case_status": CASE_STATUS_VALUES[case_status],
+                    "act_captcha_code": captcha_text,
+                    "state_code": state_code,
+                    "dist_code": dist_code,
+                    "court_complex_code": court_complex_code,
+                    "est_code": est_code,
+                })
+            if str(result.get("status", "1")) != "0":
+                return parse_result_rows(result.get("act_data", ""))
+            print(f"Search rejected: {result.get('errormsg', '')}")
+            self.limiter.record("captcha")
+        raise CaptchaRejected(f"Search failed after {max_attempts} captcha attempts")
+
+    def view_history(self, view_args):
+        """
+        Fetch the case detail fragment behind a "View" link.
+
+        Returns:
+        str: The HTML the page would load into "CSact"
+        """
+        data = dict(zip(VIEW_HISTORY_ARGS, view_args))
+        return self._post(VIEW_HISTORY_PATH, data).get("data_list", "")
+
+
+def scrape_cases(client, act_name="Indian Penal Code", section_number="376", case_status="pending",
+                 state_code="18", dist_code="3", court_complex_code="1180029@1,2,10,11@Y",
+                 est_code="1", row_filter=None, store=None, archive=None, concurrency=4):
+    """
+    Search one court over HTTP and yield the case detail dict of every matching row.
+
+    Only rows accepted by row_filter are fetched, 2024 cases by default like
+    process_search_results. With a CheckpointStore, cases already stored are
+    not fetched again and new ones are recorded. With a PageArchive, every
+    fetched detail fragment is archived.
+
+    Case details are fetched on up to concurrency threads, each request
+    waiting for a slot of the client's limiter, so the site's adaptive
+    window decides how many are in flight. They are yielded in row order.
+    Requests in flight share the latest app_token, see detail_prefetch;
+    use a concurrency of 1 if the site rejects reused tokens.
+    """
+    row_filter = row_filter or make_row_filter()
+    if case_status not in FIELD_MAPS:
+        raise ValueError(f"Not valid Case Status: {case_status}")
+
+    court = court_key(state_code, dist_code, court_complex_code, est_code)
+    tracer.set_labels(court=court)
+    with tracer.span("page_load"):
+        client.open_session()
+    act_code = client.get_act_code(act_name, state_code, dist_code, court_complex_code, est_code)
+    rows = client.search_act(act_code, section_number, case_status, state_code, dist_code,
+                             court_complex_code, est_code)
+    print(f"{len(rows)} rows found, {sum(map(row_filter, rows))} match the filter")
+
+    todo = []
+    for row in filter(row_filter, rows):
+        row_cnr = find_cnr(row["onclick"])
+        if store is not None and row_cnr and store.has_case(row_cnr):
+            print(f"Skipping row {row['index'] + 1}, case {row_cnr} already scraped.")
+            continue
+        todo.append(row)
+
+    def fetch(row):
+        # Runs on a pool thread, which does not have this thread's labels
+        with tracer.context(court=court, case=row["case_number"]), tracer.span("row"):
+            fragment = client.view_history(row["view_args"])
+            with tracer.span("detail_extract"):
+                return fragment, extract_case_fields_from_html(fragment, case_status)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [(row, executor.submit(fetch, row)) for row in todo]
+        try:
+            for row, future in futures:
+                try:
+                    fragment, case_details = future.result()
+                    cnr = find_cnr(case_details.get("CNR Number")) or find_cnr(row["onclick"])
+                    if archive is not None:
+                        archive.save(fragment, cnr, case_status, court)
+                except Exception as e:
+                    print(f"Error processing row {row['index'] + 1}: {str(e)}")
+                    continue
+                yield case_details
+                # Only stored once the caller has taken the case, so an interrupted
+                # run never stores a case missing from its output
+                if store is not None and cnr:
+                    store.save_case(cnr, case_details, case_status, court, row["case_number"], row["onclick"],
+                                    act_name, section_number)
+        finally:
+            # A caller that stops early does not wait for the rest
+            for _, future in futures:
+                future.cancel()
+
+
+if __name__ == "__main__":
+    import os
+
+    import Get_court_data as court_data
+    from checkpoint_store import CheckpointStore
+    from court_index import INDEX_FILE, find_courts, get_index
+    from crawl_pool import LABEL_FIELDS, load_courts
+    from output_sinks import open_sink
+    from page_archive import PageArchive
+
+    parser = argparse.ArgumentParser(description="Scrape courts over HTTP without a browser.")
+    parser.add_argument("courts", nargs="?",
+                        help="CSV file with state_code, dist_code, court_complex_code, est_code")
+    parser.add_argument("--court-index", default=INDEX_FILE, help="Court index to pick courts from")
+    parser.add_argument("--state", help="State code or name in the court index")
+    parser.add_argument("--district", help="District code or name in the court index")
+    parser.add_argument("--complex", help="Court complex code or name in the court index")
+    parser.add_argument("--establishment", help="Establishment code or name in the court index")
+    parser.add_argument("--base-url", default=BASE_URL, help="Root of the eCourts application")
+    parser.add_argument("--act", default="Indian Penal Code", help="Act name to search for")
+    parser.add_argument("--section", default="376", help="Section number to search for")
+    parser.add_argument("--status", choices=sorted(FIELD_MAPS), default="pending", help="Case status")
+    parser.add_argument("--output", default="case_details.csv", help="Output file, .csv, .jsonl or .parquet")
+    parser.add_argument("--checkpoint", default=None,
+                        help="SQLite checkpoint file to resume from and skip already scraped cases")
+    parser.add_argument("--archive", default=None, help="Directory to archive raw case detail pages in")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Case details fetched at once, at most; the site's adaptive limit may allow fewer")
+    parser.add_argument("--trace", default=None, help="Write per-stage timing spans to this JSON trace file")
+    parser.add_argument("--metrics", default=None, help="Write a Prometheus-style timing summary to this file")
+    add_filter_arguments(parser)
+    args = parser.parse_args()
+
+    if args.courts:
+        courts = load_courts(args.courts)
+    elif args.state or args.district or args.complex or args.establishment:
+        state_codes = [args.state] if args.state and args.state.isdigit() else None
+        courts = find_courts(get_index(args.court_index, state_codes=state_codes),
+                             args.state, args.district, args.complex, args.establishment)
+        # A missing index is built in a browser, which is not needed any more
+        court_data.quit_driver()
+    else:
+        courts = [{"state_code": "18", "dist_code": "3", "court_complex_code": "1180029@1,2,10,11@Y",
+                   "est_code": "1"}]
+
+    store = CheckpointStore(args.checkpoint) if args.checkpoint else None
+    archive = PageArchive(args.archive) if args.archive else None
+    row_filter = row_filter_from_args(args)
+    append = store is not None and os.path.exists(args.output)
+    written = 0
+    try:
+        with EcourtsHttpClient(args.base_url) as client, \
+                open_sink(args.output, LABEL_FIELDS + list(FIELD_MAPS[args.status]), append=append) as sink:
+            for court in courts:
+                codes = (court["state_code"], court["dist_code"], court["court_complex_code"], court["est_code"])
+                key = court_key(*codes)
+                if store is not None:
+                    if store.is_court_done(key, args.act, args.section, args.status):
+                        print(f"Skipping court {key}, already done")
+                        continue
+                    store.start_court(key, args.act, args.section, args.status)
+                labels = dict(zip(LABEL_FIELDS, (*codes, args.status)))
+                try:
+                    for case in scrape_cases(client, args.act, args.section, args.status, *codes,
+                                             row_filter=row_filter, store=store, archive=archive,
+                                             concurrency=args.concurrency):
+                        sink.write({**labels, **case})
+                        written += 1
+                except Exception as e:
+                    # Left unfinished, so a rerun with --checkpoint searches it again
+                    print(f"Error scraping court {key}: {str(e)}")
+                    continue
+                if store is not None:
+                    store.finish_court(key, args.act, args.section, args.status)
+    finally:
+        if store is not None:
+            store.close()
+    print(f"{written} cases from {len(courts)} courts saved to {args.output}")
+    if args.trace:
+        tracer.export_trace(args.trace)
+    if args.metrics:
+        tracer.export_metrics(args.metrics)
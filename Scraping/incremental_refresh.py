@@ -0,0 +1,239 @@
+"""
+Incremental refresh of stored pending cases, driven by their next hearing date.
+
+A pending case changes around its hearings, so a daily rerun only re-opens
+the cases whose "Next Hearing Date" has passed since they were last fetched,
+and those not refreshed for a while: every 30 days by default, sooner at the
+arguments or judgment stage, which come close before disposal. A due case's
+detail is fetched again over HTTP from the viewHistory arguments stored with
+it, without a search or captcha; a detail showing "Case disposed" means the
+case moved to the disposed list.
+
+With --check-disposed, the disposed list of every court is also searched
+once for each act and section crawled there before, so cases disposed ahead
+of their next hearing are caught as well.
+
+Every refreshed case is saved back to the store, and each one whose fields
+changed is written to a JSON Lines delta file:
+
+    {"CNR Number": "MHAU010000012024", "Court": "18|3|1180029@1,2,10,11@Y|1",
+     "Case Number": "SC/123/2024", "Reason": "hearing passed",
+     "Previous Status": "pending", "Case Status": "pending",
+     "Changes": {"Next Hearing Date": ["21st November 2024", "5th January 2025"]}}
+
+Usage:
+    python incremental_refresh.py --checkpoint checkpoint.sqlite3 [--delta delta.jsonl] [--max-age 30] [--check-disposed]
+"""
+import argparse
+import datetime
+import re
+
+from case_fields import DISPOSED_FIELDS, extract_case_fields_from_html
+from checkpoint_store import CheckpointStore, find_cnr
+from http_backend import BASE_URL, EcourtsHttpClient
+from output_sinks import JsonlSink
+from search_results import parse_onclick_args
+from tracing import tracer
+
+HEARING_DATE_FORMATS = ("%d %B %Y", "%d-%m-%Y", "%d/%m/%Y")
+ORDINAL_SUFFIX = re.compile(r"\b(\d{1,2})(st|nd|rd|th)\b", re.I)
+
+# Days between refreshes of a case at this stage (matched case-insensitively
+# within "Case Stage"), when it is shorter than the default maximum age
+STAGE_MAX_AGE_DAYS = {
+    "judgment": 7,
+    "arguments": 14,
+}
+
+
+def parse_hearing_date(text):
+    """
+    Parse a date like "21st November 2024" or "21-11-2024".
+
+    Returns:
+    datetime.date: The date, or None if text is not one
+    """
+    text = re.sub(r"\s+", " ", ORDINAL_SUFFIX.sub(r"\1", text or "")).strip()
+    for date_format in HEARING_DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def max_age_days(case_stage, default=30):
+    """
+    Days a pending case at this stage may go without a refresh.
+    """
+    stage = (case_stage or "").lower()
+    return min([default] + [days for name, days in STAGE_MAX_AGE_DAYS.items() if name in stage])
+
+
+def refresh_reason(case, today, default_max_age=30):
+    """
+    Why a stored pending case is due for a refresh.
+
+    Parameters:
+    case (dict): A case from CheckpointStore.iter_cases
+    today (datetime.date): The day of the refresh
+    default_max_age (int): Days between refreshes of a case whose hearing has not come
+
+    Returns:
+    str: "hearing passed" or "due for refresh", None if the case is not due
+    """
+    details = case["data"]
+    scraped = datetime.date.fromtimestamp(case["scraped_at"])
+    hearing = parse_hearing_date(details.get("Next Hearing Date"))
+    if hearing is not None and scraped <= hearing <= today:
+        return "hearing passed"
+    if (today - scraped).days >= max_age_days(details.get("Case Stage"), default_max_age):
+        return "due for refresh"
+    return None
+
+
+def shows_disposed(fragment):
+    """
+    True if a case detail fragment has the disposed layout.
+    """
+    status = extract_case_fields_from_html(fragment, "disposed", {"Case Status": DISPOSED_FIELDS["Case Status"]})
+    return "disposed" in status["Case Status"].lower()
+
+
+def diff_fields(old, new):
+    """
+    Fields whose text differs between two case detail dicts.
+
+    Returns:
+    dict: Field name -> [old text, new text], "N/A" where a dict lacks the field
+    """
+    return {
+        field: [old.get(field, "N/A"), new.get(field, "N/A")]
+        for field in dict.fromkeys([*old, *new])
+        if old.get(field, "N/A") != new.get(field, "N/A")
+    }
+
+
+def disposed_listing(client, store, court):
+    """
+    Search the disposed list of a court for every act and section crawled there.
+
+    Returns:
+    dict: CNR Number -> result row of the disposed list
+    """
+    codes = court.split("|")
+    listed = {}
+    for act, section in store.court_searches(court, "pending"):
+        try:
+            act_code = client.get_act_code(act, *codes)
+            rows = client.search_act(act_code, section, "disposed", *codes)
+        except Exception as e:
+            print(f"Error searching disposed {act} {section} in {court}: {str(e)}")
+            continue
+        for row in rows:
+            cnr = find_cnr(row["onclick"])
+            if cnr:
+                listed[cnr] = row
+    return listed
+
+
+def refresh_pending_cases(client, store, delta_sink, today=None, default_max_age=30,
+                          check_disposed=False, court=None):
+    """
+    Re-fetch the stored pending cases that are due and record what changed.
+
+    Parameters:
+    client (EcourtsHttpClient): HTTP client of the site the cases came from
+    store (CheckpointStore): Store holding the cases, updated in place
+    delta_sink: Sink every changed case is written to
+    today (datetime.date): The day of the refresh, today by default
+    default_max_age (int): Days between refreshes of a case whose hearing has not come
+    check_disposed (bool): Also search each court's disposed list
+    court (str): Only refresh this court key
+
+    Returns:
+    dict: Counts of pending, due, changed, disposed and failed cases
+    """
+    today = today or datetime.date.today()
+    pending = list(store.iter_cases(court, "pending"))
+    with tracer.span("page_load"):
+        client.open_session()
+
+    listed = {}
+    if check_disposed:
+        for key in sorted({case["court_key"] for case in pending}):
+            tracer.set_labels(court=key)
+            listed.update(disposed_listing(client, store, key))
+
+    due = []
+    for case in pending:
+        reason = "listed as disposed" if case["cnr"] in listed else refresh_reason(case, today, default_max_age)
+        if reason:
+            due.append((case, reason))
+    counts = {"pending": len(pending), "due": len(due), "changed": 0, "disposed": 0, "failed": 0}
+    print(f"{len(due)} of {len(pending)} pending cases due for refresh")
+
+    for case, reason in due:
+        cnr = case["cnr"]
+        onclick = listed[cnr]["onclick"] if cnr in listed else case["onclick"]
+        view_args = parse_onclick_args(onclick)
+        if not view_args:
+            print(f"Skipping case {cnr}, no View arguments stored")
+            counts["failed"] += 1
+            continue
+        try:
+            tracer.set_labels(court=case["court_key"])
+            with tracer.context(case=case["case_number"]), tracer.span("row"):
+                fragment = client.view_history(view_args)
+                if not fragment:
+                    raise ValueError("empty case detail")
+                with tracer.span("detail_extract"):
+                    case_status = "disposed" if shows_disposed(fragment) else "pending"
+                    case_details = extract_case_fields_from_html(fragment, case_status)
+        except Exception as e:
+            print(f"Error refreshing case {cnr}: {str(e)}")
+            counts["failed"] += 1
+            continue
+
+        store.save_case(cnr, case_details, case_status, case["court_key"], case["case_number"], onclick)
+        changes = diff_fields(case["data"], case_details)
+        if changes or case_status != "pending":
+            counts["changed"] += 1
+            counts["disposed"] += case_status == "disposed"
+            delta_sink.write({
+                "CNR Number": cnr,
+                "Court": case["court_key"],
+                "Case Number": case["case_number"],
+                "Reason": reason,
+                "Previous Status": "pending",
+                "Case Status": case_status,
+                "Changes": changes,
+            })
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh stored pending cases whose hearing passed or that are due.")
+    parser.add_argument("--checkpoint", required=True, help="SQLite checkpoint file of earlier crawls")
+    parser.add_argument("--delta", default="delta.jsonl", help="JSON Lines file the changed cases are written to")
+    parser.add_argument("--base-url", default=BASE_URL, help="Root of the eCourts application")
+    parser.add_argument("--max-age", type=int, default=30,
+                        help="Days after which a case is refreshed even if its hearing has not come")
+    parser.add_argument("--court", default=None, help="Only refresh this court key (state|district|complex|est)")
+    parser.add_argument("--check-disposed", action="store_true",
+                        help="Also search each court's disposed list, one captcha per act and section")
+    parser.add_argument("--trace", default=None, help="Write per-stage timing spans to this JSON trace file")
+    parser.add_argument("--metrics", default=None, help="Write a Prometheus-style timing summary to this file")
+    args = parser.parse_args()
+
+    with CheckpointStore(args.checkpoint) as store, EcourtsHttpClient(args.base_url) as client, \
+            JsonlSink(args.delta) as sink:
+        counts = refresh_pending_cases(client, store, sink, default_max_age=args.max_age,
+                                       check_disposed=args.check_disposed, court=args.court)
+    print(f"Refreshed {counts['due'] - counts['failed']} of {counts['pending']} pending cases: "
+          f"{counts['changed']} changed, {counts['disposed']} disposed, {counts['failed']} failed. "
+          f"Delta saved to {args.delta}")
+    if args.trace:
+        tracer.export_trace(args.trace)
+    if args.metrics:
+        tracer.export_metrics(args.metrics)
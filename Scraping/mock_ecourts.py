@@ -0,0 +1,656 @@
+"""
+Local stand-in for the eCourts case status service.
+
+Serves a case status page with the element IDs and XPaths Get_court_data
+relies on, and answers the AJAX endpoints behind it (and used by
+http_backend) with synthetic but deterministic cases, so both scrapers can
+be exercised and measured without hitting services.ecourts.gov.in.
+
+Latency and failures can be injected to exercise retries and the adaptive
+rate limiter: a fixed delay plus jitter per request, a random share of 503
+answers, and a capacity above which every extra request in flight slows all
+of them down and makes 503s likelier, like an overloaded server.
+
+Usage:
+    python mock_ecourts.py [--port 8800] [--cases 50] [--captcha-text cw6g23]
+                           [--latency 0.2] [--jitter 0.1] [--error-rate 0.02] [--capacity 4]
+
+Then point http_backend at http://127.0.0.1:8800/ecourtindia_v6/, or run the
+browser scraper with ECOURTS_SITE_URL=http://127.0.0.1:8800/
+"""
+import argparse
+import html
+import json
+import os
+import random
+import secrets
+import string
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+APP_ROOT = "/ecourtindia_v6/"
+CAPTCHA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "captcha.png")
+
+ACTS = {
+    "1": "Indian Penal Code",
+    "2": "Code of Criminal Procedure",
+    "3": "Protection of Children from Sexual Offences Act",
+    "4": "Negotiable Instruments Act",
+}
+
+# state -> district -> court complex -> establishments, as (code, name) pairs
+COURTS = {
+    ("18", "Maharashtra"): {
+        ("3", "Aurangabad"): {
+            ("1180029@1,2,10,11@Y", "District and Sessions Court, Aurangabad"): [
+                ("1", "District and Sessions Court, Aurangabad"),
+                ("2", "Chief Judicial Magistrate, Aurangabad"),
+            ],
+            ("1180030@3@N", "Civil and Criminal Court, Paithan"): [],
+        },
+        ("4", "Pune"): {
+            ("1180041@4,5@Y", "District and Sessions Court, Pune"): [
+                ("4", "District and Sessions Court, Pune"),
+                ("5", "Chief Judicial Magistrate, Pune"),
+            ],
+        },
+    },
+    ("3", "Karnataka"): {
+        ("1", "Bengaluru Urban"): {
+            ("1030001@1@Y", "City Civil Court Complex, Bengaluru"): [
+                ("1", "City Civil and Sessions Court, Bengaluru"),
+            ],
+        },
+    },
+}
+
+CASE_TYPES = ("S.C. - SESSIONS CASE", "SPL.CASE - SPECIAL CASE", "CRI.APPEAL - CRIMINAL APPEAL")
+STAGES = ("APPEARANCE", "CHARGE", "EVIDENCE", "ARGUMENTS", "JUDGMENT")
+DISPOSALS = ("Convicted", "Acquitted", "Compromise", "Withdrawn")
+POLICE_STATIONS = ("CIDCO", "Kranti Chowk", "Begampura", "Cantonment", "Jinsi")
+MONTHS = ("January", "February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December")
+
+
+def _options(entries):
+    return "".join(f'<option value="{html.escape(code)}">{html.escape(name)}</option>' for code, name in entries)
+
+
+def _children(params, depth):
+    """
+    (code, name) pairs of the court level below the one selected in params.
+    """
+    level = COURTS
+    for key in ("state_code", "dist_code", "court_complex_code")[:depth]:
+        level = next((children for (code, _), children in level.items() if code == params.get(key)), {})
+    return list(level) if isinstance(level, dict) else level
+
+
+def _ordinal(day):
+    if 11 <= day <= 13:
+        return f"{day:02d}th"
+    return f"{day:02d}" + {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+
+
+def _long_date(rng, year):
+    return f"{_ordinal(rng.randint(1, 28))} {MONTHS[rng.randrange(12)]} {year}"
+
+
+def _short_date(rng, year):
+    return f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{year}"
+
+
+class MockSite:
+    """
+    Synthetic case data served by the stand-in.
+
+    Parameters:
+    cases (int): Result rows per search, at most 1000
+    year (int): Year most cases are registered in
+    year_ratio (float): Share of cases registered in year, the rest are older
+    captcha_text (str): Captcha the search accepts, None to accept any non-empty text
+    seed (int): Seed for the generated cases
+    latency (float): Seconds added to every request
+    jitter (float): Up to this many more seconds added at random
+    error_rate (float): Share of requests answered with 503
+    capacity (int): Requests in flight before the site slows down and fails more, None for no limit
+    """
+
+    def __init__(self, cases=50, year=2024, year_ratio=0.7, captcha_text=None, seed=0,
+                 latency=0.0, jitter=0.0, error_rate=0.0, capacity=None):
+        self.cases = min(cases, 1000)
+        self.year = year
+        self.year_ratio = year_ratio
+        self.captcha_text = captcha_text
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.capacity = capacity
+        with open(CAPTCHA_FILE, "rb") as file:
+            self.captcha_image = file.read()
+        self.stats = {"searches": 0, "captcha_rejected": 0, "details": 0, "errors": 0, "peak_in_flight": 0}
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._rng = random.Random(seed)
+
+    def count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def enter(self):
+        """
+        Start a request: apply the injected delay and decide whether it fails.
+
+        Returns:
+        bool: True if the request should be answered with 503
+        """
+        with self._stats_lock:
+            self._in_flight += 1
+            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self._in_flight)
+            overload = max(0, self._in_flight - self.capacity) if self.capacity else 0
+            delay = self.latency * (1 + overload) + self._rng.uniform(0, self.jitter)
+            fail = self._rng.random() < min(0.9, self.error_rate + 0.2 * overload)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self.count("errors")
+        return fail
+
+    def leave(self):
+        with self._stats_lock:
+            self._in_flight -= 1
+
+    def _court_key(self, params):
+        return "|".join(params.get(key, "") for key in ("state_code", "dist_code", "court_complex_code", "est_code"))
+
+    def generate_case(self, court_key, case_status, index):
+        """
+        Build the data of one case, the same every time for the same arguments.
+        """
+        rng = random.Random(f"{self.seed}|{court_key}|{case_status}|{index}")
+        year = self.year if rng.random() < self.year_ratio else self.year - rng.randint(1, 5)
+        offset = zlib.crc32(court_key.encode()) % 500
+        serial = offset * 2000 + (index if case_status == "pending" else 1000 + index)
+        number = rng.randint(1, 999)
+        case_type = CASE_TYPES[rng.randrange(len(CASE_TYPES))]
+        case = {
+            "case_no": f"2001{serial:07d}{year}",
+            "cnr": f"MHAU01{serial:06d}{year}",
+            "case_type": case_type,
+            "case_number": f"{case_type.split(' - ')[0]}/{number}/{year}",
+            "filing_number": f"{rng.randint(1, 999)}/{year}",
+            "filing_date": _short_date(rng, year),
+            "registration_number": f"{number}/{year}",
+            "registration_date": _short_date(rng, year),
+            "first_hearing": _long_date(rng, year),
+            "next_hearing": _long_date(rng, self.year + 1),
+            "decision_date": _long_date(rng, self.year),
+            "stage": STAGES[rng.randrange(len(STAGES))],
+            "disposal": DISPOSALS[rng.randrange(len(DISPOSALS))],
+            "court": f"{rng.randint(1, 9)}-District Judge-{rng.randint(1, 5)} and Additional Sessions Judge",
+            "petitioner": "State of Maharashtra",
+            "respondent": f"Accused {serial}",
+            "police_station": POLICE_STATIONS[rng.randrange(len(POLICE_STATIONS))],
+            "fir_number": f"{rng.randint(1, 999):04d}",
+            "fir_year": str(year),
+            "transfer_date": _short_date(rng, year),
+            "case_status": case_status,
+        }
+        return case
+
+    def search_cases(self, params, case_status):
+        court_key = self._court_key(params)
+        return [self.generate_case(court_key, case_status, index) for index in range(self.cases)]
+
+    def find_case(self, params):
+        """
+        Find the case behind a viewHistory request by decoding its CNR.
+        """
+        court_key = "|".join(params.get(key, "") for key in ("state_code", "dist_code", "court_complex_code"))
+        court_key += "|" + params.get("court_code", "")
+        cnr = params.get("cino", "")
+        if len(cnr) != 16 or not cnr[6:12].isdigit():
+            return None
+        index = int(cnr[6:12]) - (zlib.crc32(court_key.encode()) % 500) * 2000
+        case_status = "pending"
+        if index >= 1000:
+            case_status, index = "disposed", index - 1000
+        if not 0 <= index < self.cases:
+            return None
+        case = self.generate_case(court_key, case_status, index)
+        return case if case["cnr"] == cnr else None
+
+
+# The case status page with the element IDs and absolute XPaths the Selenium
+# scraper uses: body/div[1]/div/main/div[2]/div/div/div[6] is the act search
+# panel (form, case detail, back button) and body/div[9] the error modal.
+CASE_STATUS_PAGE = string.Template("""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>eCourts Services (local stand-in)</title>
+<style>
+body { font-family: sans-serif; }
+.hidden { display: none; }
+.modal { display: none; position: fixed; top: 20%; left: 30%; width: 40%; background: #fff; border: 1px solid #888; }
+.modal.show { display: block; }
+#captcha_image { width: 120px; height: 40px; }
+</style>
+</head>
+<body>
+<div class="wrapper">
+<div class="container">
+<main>
+<div class="court-selection">
+<a href="#" id="leftPaneMenuCS" onclick="openCaseStatus(); return false;">Case Status</a>
+<div id="court_panel" class="hidden">
+<label>State <select id="sess_state_code"><option value="">Select state</option>$state_options</select></label>
+<label>District <select id="sess_dist_code"><option value="">Select district</option></select></label>
+<label>Court Complex <select id="court_complex_code"><option value="">Select court complex</option></select></label>
+<label>Court Establishment <select id="court_est_code"><option value="">Select court establishment</option></select></label>
+</div>
+</div>
+<div id="search_panel" class="hidden">
+<div class="card">
+<ul class="nav nav-tabs">
+<li><a href="#" id="cnr-tabMenu">CNR Number</a></li>
+<li><a href="#" id="party-tabMenu">Party Name</a></li>
+<li><a href="#" id="caseno-tabMenu">Case Number</a></li>
+<li><a href="#" id="filing-tabMenu">Filing Number</a></li>
+<li><a href="#" id="advocate-tabMenu">Advocate</a></li>
+<li><a href="#" id="act-tabMenu" onclick="openActTab(); return false;">Act</a></li>
+</ul>
+<div class="tab-content">
+<div class="tab-pane hidden">CNR Number</div>
+<div class="tab-pane hidden">Party Name</div>
+<div class="tab-pane hidden">Case Number</div>
+<div class="tab-pane hidden">Filing Number</div>
+<div class="tab-pane hidden">Advocate</div>
+<div class="tab-pane hidden" id="act_panel">
+<div id="act_form">
+<form onsubmit="return false;">
+<div>
+<label>Act <select id="actcode"><option value="">Select act type</option></select></label>
+<label>Under Section <input type="text" id="under_sec"></label>
+</div>
+<div>
+<label><input type="radio" name="rad_status" id="radPact" value="Pending" checked> Pending</label>
+<label><input type="radio" name="rad_status" id="radDact" value="Disposed"> Disposed</label>
+</div>
+<div>
+<div>
+<img id="captcha_image" src="vendor/securimage/securimage_show.php" alt="captcha">
+<input type="text" id="act_captcha_code">
+</div>
+<div><button type="button" class="btn btn-primary" onclick="submitAct()">Go</button></div>
+</div>
+</form>
+<div id="res_container"></div>
+</div>
+<div id="case_detail" class="hidden"><div id="CSact"></div></div>
+<p><button type="button" id="main_back_act" onclick="backToResults()">Back</button></p>
+</div>
+</div>
+</div>
+</div>
+</main>
+</div>
+</div>
+<div></div>
+<div></div>
+<div></div>
+<div></div>
+<div></div>
+<div></div>
+<div></div>
+<div class="modal" id="validateError">
+<div class="modal-dialog">
+<div class="modal-content">
+<div class="modal-header"><button type="button" class="btn-close" onclick="closeModal()">&times;</button></div>
+<div class="modal-body" id="validateError_msg"></div>
+</div>
+</div>
+</div>
+<input type="hidden" name="app_token" id="app_token" value="$app_token">
+<script>
+// The real pages use jQuery; readiness waits read jQuery.active
+window.jQuery = {active: 0};
+
+function byId(id) { return document.getElementById(id); }
+function show(id) { byId(id).classList.remove('hidden'); }
+function hide(id) { byId(id).classList.add('hidden'); }
+
+function showModal(message) {
+    byId('validateError_msg').innerText = message;
+    byId('validateError').classList.add('show');
+}
+
+function closeModal() {
+    byId('validateError').classList.remove('show');
+}
+
+function post(page, data) {
+    var body = new URLSearchParams(data);
+    body.set('ajax_req', 'true');
+    body.set('app_token', byId('app_token').value);
+    window.jQuery.active++;
+    return fetch('?p=' + page, {method: 'POST', headers: {'X-Requested-With': 'XMLHttpRequest'}, body: body})
+        .then(function (response) {
+            if (!response.ok) { throw new Error('Server busy (HTTP ' + response.status + ')'); }
+            return response.json();
+        })
+        .then(function (json) {
+            if (json.app_token) { byId('app_token').value = json.app_token; }
+            return json;
+        })
+        .catch(function (e) { showModal(String(e.message || e)); throw e; })
+        .finally(function () { window.jQuery.active--; });
+}
+
+function fill(selectId, placeholder, options) {
+    byId(selectId).innerHTML = '<option value="">' + placeholder + '</option>' + (options || '');
+}
+
+function courtParams() {
+    return {state_code: byId('sess_state_code').value, dist_code: byId('sess_dist_code').value,
+            court_complex_code: byId('court_complex_code').value, est_code: byId('court_est_code').value};
+}
+
+function openCaseStatus() {
+    show('court_panel');
+    show('search_panel');
+}
+
+function loadActs() {
+    var params = courtParams();
+    params.search_act = '';
+    return post('casestatus/fillActType', params).then(function (json) {
+        byId('actcode').innerHTML = json.act_list;
+    });
+}
+
+function openActTab() {
+    show('act_panel');
+    loadActs();
+}
+
+function refreshCaptcha() {
+    byId('captcha_image').src = 'vendor/securimage/securimage_show.php?' + Math.random();
+    byId('act_captcha_code').value = '';
+}
+
+byId('sess_state_code').addEventListener('change', function () {
+    fill('sess_dist_code', 'Select district');
+    fill('court_complex_code', 'Select court complex');
+    fill('court_est_code', 'Select court establishment');
+    post('casestatus/fillDistrict', {state_code: this.value}).then(function (json) {
+        fill('sess_dist_code', 'Select district', json.dist_list);
+    });
+});
+
+byId('sess_dist_code').addEventListener('change', function () {
+    fill('court_complex_code', 'Select court complex');
+    fill('court_est_code', 'Select court establishment');
+    post('casestatus/fillcomplex', courtParams()).then(function (json) {
+        fill('court_complex_code', 'Select court complex', json.complex_list);
+    });
+});
+
+byId('court_complex_code').addEventListener('change', function () {
+    fill('court_est_code', 'Select court establishment');
+    post('casestatus/fillCourtEstablishment', courtParams()).then(function (json) {
+        fill('court_est_code', 'Select court establishment', json.establishment_list);
+    });
+});
+
+function submitAct() {
+    var params = courtParams();
+    params.search_act = '';
+    params.actcode = byId('actcode').value;
+    params.under_sec = byId('under_sec').value;
+    params.case_status = byId('radDact').checked ? 'Disposed' : 'Pending';
+    params.act_captcha_code = byId('act_captcha_code').value;
+    if (!params.actcode) { showModal('Please select act'); return; }
+    post('casestatus/submitAct', params).then(function (json) {
+        refreshCaptcha();
+        if (String(json.status) === '0') { showModal(json.errormsg || 'Invalid Captcha'); return; }
+        byId('res_container').innerHTML = '<div id="res_act">' + json.act_data + '</div>';
+    });
+}
+
+function viewHistory(case_no, cino, court_code, hideparty, search_flag, state_code, dist_code,
+                     court_complex_code, search_by) {
+    byId('CSact').innerHTML = '';
+    post('home/viewHistory', {case_no: case_no, cino: cino, court_code: court_code, hideparty: hideparty,
+                              search_flag: search_flag, state_code: state_code, dist_code: dist_code,
+                              court_complex_code: court_complex_code, search_by: search_by})
+        .then(function (json) {
+            if (String(json.status) === '0') { showModal(json.errormsg || 'Case not found'); return; }
+            byId('CSact').innerHTML = json.data_list;
+            hide('act_form');
+            show('case_detail');
+        });
+}
+
+function backToResults() {
+    hide('case_detail');
+    show('act_form');
+}
+</script>
+</body>
+</html>
+""")
+
+
+def case_status_page():
+    return CASE_STATUS_PAGE.substitute(app_token=secrets.token_hex(32), state_options=_options(COURTS))
+
+
+def result_table_html(cases, params):
+    """
+    Render search results like the site's "dispTable".
+    """
+    rows = ['<tr><td colspan="4" style="text-align:center">District and Sessions Court</td></tr>']
+    for sr_no, case in enumerate(cases, start=1):
+        onclick = (f"viewHistory({case['case_no']},'{case['cnr']}',{params.get('est_code') or repr('')},'','CSAct',"
+                   f"{params.get('state_code', '')},{params.get('dist_code', '')},"
+                   f"'{params.get('court_complex_code', '')}','CSAct');return false;")
+        rows.append(
+            f"<tr><td>{sr_no}</td><td>{html.escape(case['case_number'])}</td>"
+            f"<td>{html.escape(case['petitioner'])}<br>Vs<br>{html.escape(case['respondent'])}</td>"
+            f'<td><a href="#" class="someclass" onclick="{html.escape(onclick)}">View</a></td></tr>'
+        )
+    return ('<table id="dispTable" class="table table-bordered"><thead><tr><th>Sr No</th>'
+            '<th>Case Type/Case Number/Case Year</th><th>Petitioner Name versus Respondent Name</th>'
+            '<th>View</th></tr></thead><tbody>' + "".join(rows) + "</tbody></table>")
+
+
+def case_detail_html(case):
+    """
+    Render the case detail fragment the site loads into "CSact".
+    """
+    e = {key: html.escape(value) for key, value in case.items()}
+    if case["case_status"] == "pending":
+        status_rows = (
+            f"<tr><td>First Hearing Date</td><td>{e['first_hearing']}</td></tr>"
+            f"<tr><td>Next Hearing Date</td><td><strong>{e['next_hearing']}</strong></td></tr>"
+            f"<tr><td>Case Stage</td><td><label><strong>{e['stage']}</strong></label></td></tr>"
+            f"<tr><td>Court Number and Judge</td><td><label><strong>{e['court']}</strong></label></td></tr>"
+        )
+    else:
+        status_rows = (
+            f"<tr><td>First Hearing Date</td><td>{e['first_hearing']}</td></tr>"
+            f"<tr><td>Decision Date</td><td><strong>{e['decision_date']}</strong></td></tr>"
+            f"<tr><td>Case Status</td><td><strong>Case disposed</strong></td></tr>"
+            f"<tr><td>Nature of Disposal</td><td><label><strong>{e['disposal']}</strong></label></td></tr>"
+            f"<tr><td>Court Number and Judge</td><td><label><strong>{e['court']}</strong></label></td></tr>"
+        )
+    return (
+        '<table class="table case_details_table table-bordered">'
+        f"<tr><td>Case Type</td><td colspan=\"3\">{e['case_type']}</td></tr>"
+        f"<tr><td>Filing Number</td><td>{e['filing_number']}</td><td>Filing Date</td><td>{e['filing_date']}</td></tr>"
+        f"<tr><td>Registration Number</td><td><label>{e['registration_number']}</label></td>"
+        f"<td>Registration Date:</td><td>{e['registration_date']}</td></tr>"
+        f"<tr><td>CNR Number</td><td colspan=\"3\"><span>{e['cnr']}</span></td></tr></table>"
+        f'<table class="table case_status_table table-bordered">{status_rows}</table>'
+        f"<table class=\"table Petitioner_Advocate_table\"><tr><td>1) {e['petitioner']}<br>"
+        "&nbsp;&nbsp;Advocate- A.P.P.</td></tr></table>"
+        f"<table class=\"table Respondent_Advocate_table\"><tr><td>1) {e['respondent']}</td></tr></table>"
+        "<table class=\"table acts_table\"><tr><th>Under Act(s)</th><th>Under Section(s)</th></tr>"
+        "<tr><td>Indian Penal Code</td><td>376</td></tr></table>"
+        "<table class=\"table subordinate_court_table\"><tr><td>Court Number and Name</td>"
+        "<td>2-Judicial Magistrate First Class</td></tr></table>"
+        f"<table class=\"table FIR_details_table\"><tr><td>Police Station</td><td>{e['police_station']}</td></tr>"
+        f"<tr><td>FIR Number</td><td>{e['fir_number']}</td></tr><tr><td>Year</td><td>{e['fir_year']}</td></tr></table>"
+        "<table class=\"table history_table\"><tr><th>Judge</th><th>Business On Date</th>"
+        "<th>Hearing Date</th><th>Purpose of hearing</th></tr></table>"
+        "<table class=\"table order_table\"><tr><th>Order Number</th><th>Order Date</th>"
+        "<th>Order Details</th></tr></table>"
+        "<table class=\"table transfer_table\"><tr><th>Registration Number</th><th>Transfer Date</th>"
+        "<th>From Court Number and Judge</th><th>To Court Number and Judge</th></tr>"
+        f"<tr><td>{e['registration_number']}</td><td>{e['transfer_date']}</td>"
+        f"<td>1-Principal District and Sessions Judge</td><td>{e['court']}</td></tr></table>"
+    )
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, Nagle's
+    # algorithm adds ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def site(self):
+        return self.server.site
+
+    def _send(self, body, content_type="text/html; charset=utf-8", status=200):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data):
+        data["app_token"] = secrets.token_hex(32)
+        self._send(json.dumps(data), "application/json")
+
+    def _page(self):
+        query = parse_qs(urlsplit(self.path).query, keep_blank_values=True)
+        return query.get("p", [""])[0]
+
+    def _injected(self, handler):
+        try:
+            if self.site.enter():
+                # Read the unused body, or it would be parsed as the next request
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._send("Service Unavailable", "text/plain", status=503)
+            else:
+                handler()
+        finally:
+            self.site.leave()
+
+    def do_GET(self):
+        self._injected(self._get)
+
+    def do_POST(self):
+        self._injected(self._post)
+
+    def _get(self):
+        path = urlsplit(self.path).path
+        if path.endswith("securimage_show.php"):
+            self._send(self.site.captcha_image, "image/png")
+        elif path == APP_ROOT:
+            self._send(case_status_page())
+        elif path == "/":
+            self.send_response(302)
+            self.send_header("Location", APP_ROOT)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self._send("Not found", "text/plain", status=404)
+
+    def _post(self):
+        length = int(self.headers.get("Content-Length", 0))
+        params = {key: values[0] for key, values in
+                  parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True).items()}
+        page = self._page()
+        if page == "casestatus/fillDistrict":
+            self._send_json({"dist_list": _options(_children(params, 1))})
+        elif page == "casestatus/fillcomplex":
+            self._send_json({"complex_list": _options(_children(params, 2))})
+        elif page == "casestatus/fillCourtEstablishment":
+            self._send_json({"establishment_list": _options(_children(params, 3))})
+        elif page == "casestatus/fillActType":
+            options = "".join(f'<option value="{code}">{html.escape(name)}</option>' for code, name in ACTS.items())
+            self._send_json({"act_list": '<option value="">Select act type</option>' + options})
+        elif page == "casestatus/submitAct":
+            self.site.count("searches")
+            captcha = params.get("act_captcha_code", "")
+            if not captcha or (self.site.captcha_text and captcha != self.site.captcha_text):
+                self.site.count("captcha_rejected")
+                self._send_json({"status": 0, "errormsg": "Invalid Captcha"})
+                return
+            case_status = "disposed" if params.get("case_status") == "Disposed" else "pending"
+            cases = self.site.search_cases(params, case_status)
+            self._send_json({"status": 1, "act_data": result_table_html(cases, params)})
+        elif page == "home/viewHistory":
+            self.site.count("details")
+            case = self.site.find_case(params)
+            if case is None:
+                self._send_json({"status": 0, "errormsg": "Case not found"})
+                return
+            self._send_json({"status": 1, "data_list": case_detail_html(case)})
+        else:
+            self._send("Not found", "text/plain", status=404)
+
+
+def start_server(host="127.0.0.1", port=0, **site_options):
+    """
+    Start the stand-in on a background thread.
+
+    Parameters:
+    host (str): Interface to listen on
+    port (int): Port to listen on, 0 picks a free one
+    site_options: Keyword arguments for MockSite
+
+    Returns:
+    ThreadingHTTPServer: The running server, base_url holds its application root
+    """
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.site = MockSite(**site_options)
+    server.base_url = f"http://{host}:{server.server_address[1]}{APP_ROOT}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the eCourts case status service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8800, help="Port to listen on")
+    parser.add_argument("--cases", type=int, default=50, help="Result rows per search")
+    parser.add_argument("--captcha-text", default=None, help="Only accept this captcha text")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many more random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--capacity", type=int, default=None,
+                        help="Requests in flight before the site slows down and fails more")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    server.site = MockSite(cases=args.cases, captcha_text=args.captcha_text, latency=args.latency,
+                           jitter=args.jitter, error_rate=args.error_rate, capacity=args.capacity)
+    print(f"Serving on http://{args.host}:{args.port}{APP_ROOT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
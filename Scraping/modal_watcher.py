@@ -0,0 +1,79 @@
+"""
+Event-driven watcher for the site's "validateError" modal.
+
+A MutationObserver is registered through the DevTools protocol to run on
+every new document of the session. Whenever the modal becomes visible it is
+closed at once and its message is queued on the page, so action steps never
+block polling for it; they read the queued messages in a single cheap call.
+"""
+
+# Runs before any page script; keeps watching across AJAX re-renders
+WATCHER_JS = r"""
+(function () {
+    if (window.__ecourtsModalWatcher) { return; }
+    window.__ecourtsModalWatcher = true;
+    window.__ecourtsModalEvents = [];
+
+    function isShown(modal) {
+        return modal.classList.contains('show') || window.getComputedStyle(modal).display === 'block';
+    }
+
+    function closeButton(modal) {
+        var button = modal.querySelector('.btn-close, [data-bs-dismiss="modal"], [data-dismiss="modal"], button.close');
+        if (button) { return button; }
+        return document.evaluate('/html/body/div[9]/div/div/div[1]/button', document, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    }
+
+    function check() {
+        var modal = document.getElementById('validateError');
+        if (!modal) { return; }
+        if (!isShown(modal)) {
+            modal.__ecourtsSeen = false;
+            return;
+        }
+        if (modal.__ecourtsSeen) { return; }
+        modal.__ecourtsSeen = true;
+        var body = modal.querySelector('.modal-body') || modal;
+        window.__ecourtsModalEvents.push({message: body.innerText.trim(), time: Date.now()});
+        var button = closeButton(modal);
+        if (button) { button.click(); }
+    }
+
+    new MutationObserver(check).observe(document, {
+        subtree: true, childList: true, attributes: true, attributeFilter: ['style', 'class']
+    });
+})();
+"""
+
+DRAIN_EVENTS_JS = """
+var events = window.__ecourtsModalEvents || [];
+window.__ecourtsModalEvents = [];
+return events;
+"""
+
+
+def install_modal_watcher(driver):
+    """
+    Register the watcher for every page the session loads from now on, and
+    start it on the current page.
+    """
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": WATCHER_JS})
+    driver.execute_script(WATCHER_JS)
+
+
+def drain_modal_events(driver):
+    """
+    Return and clear the modals dismissed since the last call.
+
+    Returns:
+    list: Dicts with the modal's message and the time (ms since epoch) it appeared
+    """
+    return driver.execute_script(DRAIN_EVENTS_JS) or []
+
+
+def is_captcha_error(message):
+    """
+    True if a modal message says the captcha was wrong.
+    """
+    return "captcha" in (message or "").lower()
@@ -0,0 +1,202 @@
+"""
+Streaming output writers for scraped cases.
+
+Each case is written and flushed as soon as it is scraped, so a crash loses
+at most the case in flight and memory does not grow with the result set.
+The format is picked from the file extension: .csv, .jsonl or .parquet.
+
+Parquet needs the optional pyarrow package. A .parquet output is a dataset
+directory: cases are journaled to a JSON Lines file in it as they come, and
+every full batch is written as its own part file, e.g. cases.parquet/
+part-00000.parquet, which pyarrow and pandas read as one table. A crash
+leaves the finished parts readable and the journal is turned into a part
+when the dataset is next opened for appending.
+
+Appending checks that the existing output has the same columns, so tools
+writing different schemas cannot mix their rows in one file.
+"""
+import csv
+import glob
+import json
+import os
+
+from case_fields import ALL_FIELDS
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class CsvSink:
+    """
+    Write cases to a CSV file with a fixed set of columns.
+
+    Parameters:
+    filename (str): Output file
+    fieldnames (list): Columns, ALL_FIELDS by default. Missing fields are
+    written as "N/A" and keys outside the schema are dropped.
+    append (bool): Add to an existing file instead of replacing it
+    """
+
+    def __init__(self, filename, fieldnames=None, append=False):
+        self.filename = filename
+        self.fieldnames = list(fieldnames or ALL_FIELDS)
+        write_header = not (append and os.path.exists(filename) and os.path.getsize(filename) > 0)
+        if not write_header:
+            with open(filename, newline='', encoding='utf-8') as file:
+                header = next(csv.reader(file), [])
+            if header != self.fieldnames:
+                raise ValueError(f"Cannot append to {filename}: its columns differ from this output's, "
+                                 f"use another output file")
+        self.file = open(filename, mode='a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=self.fieldnames, restval="N/A", extrasaction="ignore")
+        if write_header:
+            self.writer.writeheader()
+            self.file.flush()
+        self.count = 0
+
+    def write(self, case):
+        self.writer.writerow(case)
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonlSink:
+    """
+    Write cases to a JSON Lines file, one object per line.
+    """
+
+    def __init__(self, filename, fieldnames=None, append=False):
+        self.filename = filename
+        self.file = open(filename, mode='a' if append else 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, case):
+        self.file.write(json.dumps(case, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetSink:
+    """
+    Write cases to a Parquet dataset directory with one string column per field.
+
+    Parameters:
+    filename (str): Output directory, created if missing
+    fieldnames (list): Columns, ALL_FIELDS by default
+    append (bool): Add parts to an existing dataset instead of replacing its parts
+    batch_size (int): Cases journaled before they are written as a part file
+    """
+
+    JOURNAL = "_pending.jsonl"
+
+    def __init__(self, filename, fieldnames=None, append=False, batch_size=500):
+        if pyarrow is None:
+            raise ImportError("Writing Parquet needs pyarrow: pip install pyarrow")
+        if os.path.isfile(filename):
+            raise ValueError(f"{filename} is a Parquet file; the output is written as a dataset directory")
+        self.filename = filename
+        self.fieldnames = list(fieldnames or ALL_FIELDS)
+        self.schema = pyarrow.schema([(name, pyarrow.string()) for name in self.fieldnames])
+        self.batch_size = batch_size
+        self.journal_path = os.path.join(filename, self.JOURNAL)
+        os.makedirs(filename, exist_ok=True)
+        parts = sorted(glob.glob(os.path.join(filename, "part-*.parquet")))
+        if not append:
+            for path in parts + [self.journal_path]:
+                if os.path.exists(path):
+                    os.remove(path)
+            parts = []
+        elif parts and pyarrow.parquet.read_schema(parts[-1]).names != self.fieldnames:
+            raise ValueError(f"Cannot append to {filename}: its columns differ from this output's, "
+                             f"use another output file")
+        self.next_part = int(os.path.basename(parts[-1])[5:-8]) + 1 if parts else 0
+        # Cases journaled by a run that stopped before writing them as a part
+        self.batch = []
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding='utf-8') as file:
+                self.batch = [json.loads(line) for line in file if line.endswith("\n")]
+        self.journal = open(self.journal_path, mode='a', encoding='utf-8')
+        self.flush()
+        self.count = 0
+
+    def write(self, case):
+        self.batch.append(case)
+        self.journal.write(json.dumps(case, ensure_ascii=False) + "\n")
+        self.journal.flush()
+        self.count += 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the journaled cases as the next part file and empty the journal.
+        """
+        if not self.batch:
+            return
+        columns = {name: [case.get(name, "N/A") for case in self.batch] for name in self.fieldnames}
+        path = os.path.join(self.filename, f"part-{self.next_part:05d}.parquet")
+        # Readers skip dot files, so a part is only seen once it is complete
+        temp_path = os.path.join(self.filename, f".part-{self.next_part:05d}.parquet.tmp")
+        pyarrow.parquet.write_table(pyarrow.table(columns, schema=self.schema), temp_path)
+        os.replace(temp_path, path)
+        self.next_part += 1
+        self.batch = []
+        self.journal.truncate(0)
+
+    def close(self):
+        self.flush()
+        self.journal.close()
+        os.remove(self.journal_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+SINKS = {
+    ".csv": CsvSink,
+    ".jsonl": JsonlSink,
+    ".parquet": ParquetSink,
+}
+
+
+def open_sink(filename, fieldnames=None, append=False):
+    """
+    Open the streaming writer matching the file extension.
+
+    Parameters:
+    filename (str): Output file ending in .csv, .jsonl or .parquet, the last
+    a dataset directory
+    fieldnames (list): Columns for CSV and Parquet, ALL_FIELDS by default
+    append (bool): Add to an existing output with the same columns
+
+    Returns:
+    CsvSink, JsonlSink or ParquetSink
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported output format: {filename} (use .csv, .jsonl or .parquet)")
+    return SINKS[extension](filename, fieldnames, append)
@@ -0,0 +1,134 @@
+"""
+Compressed, content-addressed archive of raw case detail pages.
+
+Every saved "CSact" page is stored once under the SHA-256 of its HTML as
+objects/<2 hex>/<rest>.html.gz, and index.jsonl records which case, court
+and case status it belongs to. When a field XPath turns out to be wrong, fix
+it in case_fields and re-extract the whole archive offline across processes
+instead of crawling again.
+
+Usage:
+    python page_archive.py reextract page_archive --output case_details.csv [--workers 8]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from case_fields import ALL_FIELDS, FIELD_MAPS, extract_case_fields_from_html
+
+
+class PageArchive:
+    """
+    Directory of gzip-compressed case detail pages keyed by content hash.
+
+    Safe to share between processes: objects are written to a temporary
+    file and renamed into place, and each index entry is one appended line.
+
+    Parameters:
+    root (str): Archive directory, created if missing
+    """
+
+    def __init__(self, root="page_archive"):
+        self.root = root
+        self.index_file = os.path.join(root, "index.jsonl")
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, "objects", digest[:2], digest[2:] + ".html.gz")
+
+    def save(self, page_html, cnr, case_status, court=""):
+        """
+        Store a page and index it under its case.
+
+        Returns:
+        str: The SHA-256 hex digest the page is stored under
+        """
+        data = page_html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(gzip.compress(data))
+            os.replace(tmp_path, path)
+
+        entry = {"sha256": digest, "cnr": cnr, "case_status": case_status, "court": court,
+                 "saved_at": time.time()}
+        with open(self.index_file, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+        return digest
+
+    def load(self, digest):
+        """
+        Return the HTML stored under a digest.
+        """
+        with open(self._object_path(digest), "rb") as file:
+            return gzip.decompress(file.read()).decode("utf-8")
+
+    def entries(self):
+        """
+        Latest index entry of every archived case, keyed by CNR (or digest when
+        the CNR is unknown).
+
+        Returns:
+        list: Index entry dicts
+        """
+        latest = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        latest[entry.get("cnr") or entry["sha256"]] = entry
+        return list(latest.values())
+
+
+def _extract_entry(args):
+    root, entry = args
+    case_details = extract_case_fields_from_html(PageArchive(root).load(entry["sha256"]), entry["case_status"])
+    return {"Archive SHA256": entry["sha256"], **case_details}
+
+
+def reextract(root, sink, workers=None):
+    """
+    Re-run the current field maps over every archived page in parallel.
+
+    Parameters:
+    root (str): Archive directory
+    sink: Writer from output_sinks receiving one dict per archived case
+    workers (int): Worker processes, one per CPU by default
+
+    Returns:
+    int: Number of cases written
+    """
+    entries = [entry for entry in PageArchive(root).entries() if entry["case_status"] in FIELD_MAPS]
+    print(f"Re-extracting {len(entries)} archived pages")
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, len(entries) // ((workers or os.cpu_count() or 1) * 4))
+        for case_details in executor.map(_extract_entry, [(root, entry) for entry in entries], chunksize=chunksize):
+            sink.write(case_details)
+            written += 1
+    return written
+
+
+if __name__ == "__main__":
+    from output_sinks import open_sink
+
+    parser = argparse.ArgumentParser(description="Work with the raw case detail page archive.")
+    parser.add_argument("command", choices=("reextract",))
+    parser.add_argument("archive", help="Archive directory")
+    parser.add_argument("--output", default="case_details_reextracted.csv",
+                        help="Output file, .csv, .jsonl or .parquet")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    with open_sink(args.output, ["Archive SHA256"] + ALL_FIELDS) as sink:
+        count = reextract(args.archive, sink, args.workers)
+    print(f"{count} cases written to {args.output}")
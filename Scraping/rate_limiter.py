@@ -0,0 +1,245 @@
+"""
+Per-host adaptive concurrency limit (AIMD) and jittered retry backoff.
+
+Every request to a host goes through its limiter's slot(). The limiter
+allows `window` requests in flight: each success answered within the
+latency target widens the window by 1/window (about one more slot per
+window of successes), and a timeout, server error, captcha rejection, error
+modal or slow answer halves it, at most once per cooldown so one burst of
+failures counts once. Failed calls are retried after a random delay of up to
+base * 2**attempt seconds ("full jitter"), so workers that failed together
+do not come back together.
+
+Each process keeps its own limiters by default. A pool of worker processes
+shares one instead: start_shared_limiter runs it in a manager process and
+every worker gets a SharedLimiter for it, so the window is the number of
+requests in flight across all workers together.
+
+    limiter = limiter_for("https://services.ecourts.gov.in/")
+    with limiter.slot() as slot:
+        response = session.post(...)
+        if response.status_code >= 500:
+            slot.outcome = "error"
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing.managers import BaseManager
+from urllib.parse import urlsplit
+
+# Outcomes that mean the site is struggling and the window should shrink
+PENALTY_OUTCOMES = ("timeout", "error", "captcha", "modal", "slow")
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """
+    Random delay before retry number attempt (0 for the first retry).
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class Slot:
+    """
+    One request in flight; set outcome to report how it went.
+    """
+
+    def __init__(self):
+        self.outcome = "ok"
+
+
+class LimiterBase:
+    """
+    slot() and retry() on top of a limiter's acquire, release, record and note_retry.
+    """
+
+    @contextmanager
+    def slot(self):
+        """
+        Wait for a free slot, then time the block and record its outcome.
+        An exception escaping the block counts as "error" unless the block
+        set another outcome.
+        """
+        self.acquire()
+        slot = Slot()
+        started = time.perf_counter()
+        try:
+            yield slot
+        except BaseException:
+            if slot.outcome == "ok":
+                slot.outcome = "error"
+            raise
+        finally:
+            self.release()
+            self.record(slot.outcome, time.perf_counter() - started)
+
+    def retry(self, func, max_attempts=4, retry_on=(Exception,), base=0.5, cap=30.0):
+        """
+        Call func(), retrying after a jittered backoff when it raises one of retry_on.
+        """
+        for attempt in range(max_attempts):
+            try:
+                return func()
+            except retry_on as e:
+                if attempt == max_attempts - 1:
+                    raise
+                delay = backoff_delay(attempt, base, cap)
+                self.note_retry()
+                print(f"Retrying in {delay:.1f}s after: {str(e)}")
+                time.sleep(delay)
+
+
+class AimdLimiter(LimiterBase):
+    """
+    Adaptive limit on the requests in flight to one host.
+
+    Parameters:
+    initial (float): Starting window
+    minimum (float): Smallest window
+    maximum (float): Largest window
+    latency_target (float): Seconds above which a success counts as "slow"
+    decrease (float): Factor the window is multiplied by on a penalty
+    cooldown (float): Seconds after a decrease during which penalties do not decrease again
+    """
+
+    def __init__(self, initial=2, minimum=1, maximum=16, latency_target=5.0, decrease=0.5, cooldown=2.0):
+        self.window = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.stats = {"ok": 0, **{outcome: 0 for outcome in PENALTY_OUTCOMES}, "decreases": 0, "retries": 0}
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def limit(self):
+        """
+        Requests currently allowed in flight.
+        """
+        with self._condition:
+            return max(1, int(self.window))
+
+    def record(self, outcome, latency=None):
+        """
+        Adjust the window for one finished request.
+
+        Parameters:
+        outcome (str): "ok" or one of PENALTY_OUTCOMES
+        latency (float): Seconds the request took, if known
+        """
+        if outcome == "ok" and latency is not None and self.latency_target and latency > self.latency_target:
+            outcome = "slow"
+        with self._condition:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+            if outcome == "ok":
+                self.window = min(self.maximum, self.window + 1 / self.window)
+            elif outcome in PENALTY_OUTCOMES:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self.window = max(self.minimum, self.window * self.decrease)
+                    self._last_decrease = now
+                    self.stats["decreases"] += 1
+            self._condition.notify_all()
+
+    def acquire(self, count=1):
+        """
+        Wait until count more requests fit in the window, or none are in
+        flight, and take their slots. Pair with release(count).
+        """
+        with self._condition:
+            while self.in_flight and self.in_flight + count > max(1, int(self.window)):
+                self._condition.wait()
+            self.in_flight += count
+
+    def release(self, count=1):
+        with self._condition:
+            self.in_flight -= count
+            self._condition.notify_all()
+
+    def note_retry(self):
+        with self._condition:
+            self.stats["retries"] += 1
+
+    def get_stats(self):
+        with self._condition:
+            return dict(self.stats)
+
+
+class LimiterManager(BaseManager):
+    """
+    Manager process serving AimdLimiters to the processes of a pool.
+    """
+
+
+LimiterManager.register("AimdLimiter", AimdLimiter,
+                        exposed=("limit", "record", "acquire", "release", "note_retry", "get_stats"))
+
+
+class SharedLimiter(LimiterBase):
+    """
+    An AimdLimiter living in a LimiterManager, usable from any process it is
+    passed to (e.g. as a pool initializer argument) like a local one.
+
+    Parameters:
+    proxy: The manager's proxy of the AimdLimiter
+    """
+
+    def __init__(self, proxy):
+        self.proxy = proxy
+
+    def limit(self):
+        return self.proxy.limit()
+
+    def record(self, outcome, latency=None):
+        self.proxy.record(outcome, latency)
+
+    def acquire(self, count=1):
+        self.proxy.acquire(count)
+
+    def release(self, count=1):
+        self.proxy.release(count)
+
+    def note_retry(self):
+        self.proxy.note_retry()
+
+    @property
+    def stats(self):
+        return self.proxy.get_stats()
+
+
+def start_shared_limiter(**options):
+    """
+    Start a manager process holding one AimdLimiter created with options.
+
+    Returns:
+    tuple: The LimiterManager, to shut down when done, and a SharedLimiter
+    for it
+    """
+    manager = LimiterManager()
+    manager.start()
+    return manager, SharedLimiter(manager.AimdLimiter(**options))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(url, **options):
+    """
+    The process-wide limiter of the host of a URL, created with options on first use.
+    """
+    host = urlsplit(url).netloc or url
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = AimdLimiter(**options)
+        return _limiters[host]
+
+
+def set_limiter(url, limiter):
+    """
+    Make limiter, e.g. a SharedLimiter, the process-wide limiter of the host of a URL.
+    """
+    with _limiters_lock:
+        _limiters[urlsplit(url).netloc or url] = limiter
@@ -0,0 +1,170 @@
+"""
+Search result ("dispTable") rows as plain data, and row filters.
+
+The whole result table is read in one call, either from the live page with
+execute_script or from the HTML fragment the site returns, into dicts with
+index, sr_no, case_number, parties, onclick and view_args. Filters are
+applied to those dicts before any "View" is clicked, and a row is later
+found again by its onclick, so re-rendering the table between cases cannot
+leave stale element references.
+"""
+import csv
+import re
+
+from lxml import html as lxml_html
+
+# Reads every case row of dispTable; rows without a link are the court name
+# headings between groups of cases
+READ_RESULTS_JS = """
+var table = document.getElementById('dispTable');
+if (!table) { return []; }
+var rows = [];
+table.querySelectorAll('tr').forEach(function (tr) {
+    var cells = tr.querySelectorAll('td');
+    var link = cells.length ? cells[cells.length - 1].querySelector('a[onclick]') : null;
+    if (!link) { return; }
+    rows.push({
+        index: rows.length,
+        sr_no: cells[0].innerText.trim(),
+        case_number: cells.length > 1 ? cells[1].innerText.trim() : '',
+        parties: cells.length > 2 ? cells[2].innerText.trim() : '',
+        onclick: link.getAttribute('onclick')
+    });
+});
+return rows;
+"""
+
+# Empties the results container and drops the old table before a search, so
+# only what the new search loads into them counts as its results
+CLEAR_RESULTS_JS = """
+var table = document.getElementById('dispTable');
+if (table) { table.remove(); }
+var results = document.getElementById('res_act');
+if (results) { results.innerHTML = ''; }
+"""
+
+# True once a search has loaded anything into the results container
+RESULTS_LOADED_JS = """
+var results = document.getElementById('res_act');
+return !!results && (results.children.length > 0 || results.textContent.trim().length > 0);
+"""
+
+# Clicks the "View" link whose onclick matches, looked up in the current DOM,
+# after emptying "CSact" so the previous case's tables cannot pass for this
+# one's. Returns false while the table is not (re)rendered yet.
+CLICK_VIEW_JS = """
+var links = document.querySelectorAll('#dispTable td a[onclick]');
+for (var i = 0; i < links.length; i++) {
+    if (links[i].getAttribute('onclick') === arguments[0]) {
+        var detail = document.getElementById('CSact');
+        if (detail) { detail.innerHTML = ''; }
+        links[i].click();
+        return true;
+    }
+}
+return false;
+"""
+
+
+def parse_onclick_args(onclick):
+    """
+    Split the arguments of a "viewHistory(a,'b',...)" onclick handler into strings.
+    """
+    match = re.search(r"\((.*)\)", onclick or "", re.S)
+    if not match or not match.group(1).strip():
+        return []
+    return [arg.strip() for arg in next(csv.reader([match.group(1)], quotechar="'", skipinitialspace=True))]
+
+
+def read_result_rows(driver):
+    """
+    Read the whole result table from the live page in one round trip.
+
+    Returns:
+    list: Row dicts, see the module docstring
+    """
+    rows = driver.execute_script(READ_RESULTS_JS) or []
+    for row in rows:
+        row["view_args"] = parse_onclick_args(row["onclick"])
+    return rows
+
+
+def parse_result_rows(fragment):
+    """
+    Parse the "dispTable" search results fragment into plain rows.
+
+    Returns:
+    list: Row dicts, see the module docstring
+    """
+    if not fragment or not fragment.strip():
+        return []
+    root = lxml_html.fragment_fromstring(fragment, create_parent="div")
+    rows = []
+    for index, row in enumerate(root.xpath('//*[@id="dispTable"]//tr[td[last()]//a[@onclick]]')):
+        cells = row.xpath("./td")
+        onclick = cells[-1].xpath(".//a[@onclick]")[0].get("onclick")
+        rows.append({
+            "index": index,
+            "sr_no": cells[0].text_content().strip(),
+            "case_number": cells[1].text_content().strip() if len(cells) > 1 else "",
+            "parties": cells[2].text_content().strip() if len(cells) > 2 else "",
+            "onclick": onclick,
+            "view_args": parse_onclick_args(onclick),
+        })
+    return rows
+
+
+def case_year(case_number):
+    """
+    The year at the end of a case number such as "S.C./198/2024", or None.
+    """
+    match = re.search(r'(\d{4})$', case_number.strip())
+    return int(match.group(1)) if match else None
+
+
+def make_row_filter(year_from=2024, year_to=2024, case_types=None, number_pattern=None):
+    """
+    Build a predicate that decides which result rows are worth opening.
+
+    Parameters:
+    year_from (int): Earliest case year, None for no lower bound
+    year_to (int): Latest case year, None for no upper bound
+    case_types (list): Case type prefixes to keep, e.g. ["S.C.", "SPL.CASE"], None for all
+    number_pattern (str): Regular expression the case number must contain, None for all
+
+    Returns:
+    function: row dict -> bool. The defaults keep only 2024 cases, as before.
+    """
+    pattern = re.compile(number_pattern) if number_pattern else None
+    types = {case_type.strip().upper() for case_type in case_types} if case_types else None
+
+    def row_filter(row):
+        case_number = row["case_number"]
+        year = case_year(case_number)
+        if (year_from is not None or year_to is not None) and year is None:
+            return False
+        if year_from is not None and year < year_from:
+            return False
+        if year_to is not None and year > year_to:
+            return False
+        if types is not None and case_number.split("/")[0].strip().upper() not in types:
+            return False
+        if pattern is not None and not pattern.search(case_number):
+            return False
+        return True
+
+    return row_filter
+
+
+def add_filter_arguments(parser):
+    """
+    Add the row filter options to an argparse parser.
+    """
+    parser.add_argument("--year-from", type=int, default=2024, help="Earliest case year to open")
+    parser.add_argument("--year-to", type=int, default=2024, help="Latest case year to open")
+    parser.add_argument("--case-type", action="append", help="Case type prefix to open, may be repeated")
+    parser.add_argument("--number-pattern", help="Regular expression the case number must match")
+
+
+def row_filter_from_args(args):
+    return make_row_filter(args.year_from, args.year_to, args.case_type, args.number_pattern)
@@ -0,0 +1,73 @@
+"""
+http_backend and rate_limiter against the local stand-in, mock_ecourts.
+
+OCR is replaced by a fixed reading of the stand-in's captcha, so neither a
+browser nor tesseract is needed.
+
+Usage:
+    python -m pytest Scraping/tests
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_backend
+from case_fields import DISPOSED_FIELDS, PENDING_FIELDS
+from checkpoint_store import CheckpointStore
+from mock_ecourts import start_server
+
+CAPTCHA_TEXT = "test1"
+CASES = 12
+
+
+@pytest.fixture(autouse=True)
+def fixed_captcha(monkeypatch):
+    reading = {"text": CAPTCHA_TEXT, "confidence": 100.0, "score": 100.0, "variant": {}}
+    monkeypatch.setattr(http_backend, "read_captcha_bytes", lambda img_bytes: reading)
+
+
+def serve(**site_options):
+    return start_server(cases=CASES, captcha_text=CAPTCHA_TEXT, **site_options)
+
+
+def scrape(server, case_status="pending", store=None, max_attempts=4):
+    with http_backend.EcourtsHttpClient(server.base_url, max_attempts=max_attempts) as client:
+        cases = list(http_backend.scrape_cases(client, case_status=case_status, row_filter=lambda row: True,
+                                               store=store))
+    return cases, client
+
+
+@pytest.mark.parametrize("case_status, fields", [("pending", PENDING_FIELDS), ("disposed", DISPOSED_FIELDS)])
+def test_scrape_cases_yields_status_fields(case_status, fields):
+    server = serve()
+    try:
+        cases, _ = scrape(server, case_status)
+    finally:
+        server.shutdown()
+    assert len(cases) == CASES
+    assert all(list(case) == list(fields) for case in cases)
+
+
+def test_checkpoint_rerun_skips_scraped_cases(tmp_path):
+    server = serve()
+    try:
+        with CheckpointStore(str(tmp_path / "checkpoint.sqlite3")) as store:
+            first, _ = scrape(server, store=store)
+            second, _ = scrape(server, store=store)
+    finally:
+        server.shutdown()
+    assert len(first) == CASES
+    assert second == []
+
+
+def test_limiter_retries_server_errors():
+    server = serve(error_rate=0.2)
+    try:
+        cases, client = scrape(server, max_attempts=10)
+    finally:
+        server.shutdown()
+    assert len(cases) == CASES
+    assert client.limiter.stats["retries"] > 0
@@ -0,0 +1,174 @@
+"""
+Per-stage timing spans with JSON trace and Prometheus-style metrics export.
+
+Wrap each stage of a run in tracer.span("stage"); labels such as the court
+and case are taken from the enclosing tracer.context(...) blocks. The spans
+can be written as a Chrome trace event file (open it in chrome://tracing or
+ui.perfetto.dev) and summarised per stage and court in the Prometheus text
+format.
+
+    with tracer.context(court=court):
+        with tracer.span("captcha"):
+            ...
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+STAGES = ("page_load", "dropdown_select", "modal_check", "captcha", "search", "row", "prefetch",
+          "detail_extract", "back_navigation", "driver_recycle")
+
+
+class Tracer:
+    """
+    Collects timing spans from any thread of this process.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _labels(self):
+        return getattr(self._local, "labels", {})
+
+    def set_labels(self, **labels):
+        """
+        Set labels for every later span on this thread, e.g. the court a
+        worker is crawling.
+        """
+        self._local.labels = {**self._labels(), **labels}
+
+    @contextmanager
+    def context(self, **labels):
+        """
+        Add labels to every span started inside the block on this thread.
+        """
+        previous = self._labels()
+        self._local.labels = {**previous, **labels}
+        try:
+            yield
+        finally:
+            self._local.labels = previous
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """
+        Time the block as one span of the given stage.
+        """
+        start = time.time()
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            record = {
+                "stage": stage,
+                "start": start,
+                "duration": time.perf_counter() - started,
+                "labels": {**self._labels(), **labels},
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            }
+            if error:
+                record["error"] = error
+            with self._lock:
+                self.spans.append(record)
+
+    def traced(self, stage):
+        """
+        Decorator recording every call of a function as a span.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def drain(self):
+        """
+        Remove and return the spans recorded so far, e.g. to send them from a
+        pool worker to the parent process.
+        """
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def extend(self, spans):
+        with self._lock:
+            self.spans.extend(spans)
+
+    def export_trace(self, filename):
+        """
+        Write the spans as a Chrome trace event JSON file.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        events = [{
+            "name": span["stage"],
+            "cat": "ecourts",
+            "ph": "X",
+            "ts": span["start"] * 1e6,
+            "dur": span["duration"] * 1e6,
+            "pid": span["pid"],
+            "tid": span["tid"],
+            "args": dict(span["labels"], **({"error": span["error"]} if "error" in span else {})),
+        } for span in spans]
+        with open(filename, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        print(f"Trace with {len(events)} spans saved to {filename}")
+
+    def metrics(self):
+        """
+        Summarise the spans per stage and court in the Prometheus text format.
+
+        Returns:
+        str: Summary metric ecourts_stage_seconds with 0.5 and 0.95
+        quantiles, sum and count, and ecourts_stage_errors_total
+        """
+        with self._lock:
+            spans = list(self.spans)
+        groups = {}
+        errors = {}
+        for span in spans:
+            key = (span["stage"], span["labels"].get("court", ""))
+            groups.setdefault(key, []).append(span["duration"])
+            if "error" in span:
+                errors[key] = errors.get(key, 0) + 1
+
+        lines = [
+            "# HELP ecourts_stage_seconds Time spent in each scraping stage.",
+            "# TYPE ecourts_stage_seconds summary",
+        ]
+        for (stage, court), durations in sorted(groups.items()):
+            durations.sort()
+            labels = f'stage="{stage}",court="{court}"'
+            for quantile in (0.5, 0.95):
+                value = durations[min(len(durations) - 1, int(len(durations) * quantile))]
+                lines.append(f'ecourts_stage_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+            lines.append(f"ecourts_stage_seconds_sum{{{labels}}} {sum(durations):.6f}")
+            lines.append(f"ecourts_stage_seconds_count{{{labels}}} {len(durations)}")
+        lines += [
+            "# HELP ecourts_stage_errors_total Spans that ended with an exception.",
+            "# TYPE ecourts_stage_errors_total counter",
+        ]
+        for (stage, court), count in sorted(errors.items()):
+            lines.append(f'ecourts_stage_errors_total{{stage="{stage}",court="{court}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def export_metrics(self, filename):
+        with open(filename, "w", encoding="utf-8") as file:
+            file.write(self.metrics())
+        print(f"Metrics saved to {filename}")
+
+
+# Process-wide tracer used by the scraping modules
+tracer = Tracer()